@@ -0,0 +1,191 @@
+# benchmark_whisper.py
+"""
+Benchmark für run_whisper_auto.py
+Misst Echtzeitfaktor (RTF), Latenz je Datei (p50/p95) und Spitzen-RSS
+über mehrere Modellgrößen, Worker- und Thread-Anzahlen und schreibt JSON + CSV.
+Modell laden bzw. Pool starten steht als eigene Spalte (start_sek) und zählt nicht zu RTF.
+
+Beispiel:
+    python benchmark_whisper.py --models base,small --workers 1,2,4 --threads 0,2 --out bench_whisper
+"""
+import argparse
+import csv
+import json
+import math
+import multiprocessing as mp
+import queue
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+import run_whisper_auto as rwa
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SAMPLE_RATE = rwa.whisper.audio.SAMPLE_RATE
+
+
+def erzeuge_korpus(ziel: Path, dauern: list, pro_dauer: int, seed: int = 0) -> list:
+    """Schreibt synthetische, sprachähnliche WAVs (Grundton mit Obertönen,
+    Silbenhüllkurve, Rauschen). Gleicher Seed ergibt den gleichen Korpus."""
+    rng = np.random.default_rng(seed)
+    ziel.mkdir(parents=True, exist_ok=True)
+    dateien = []
+    for dauer in dauern:
+        for i in range(pro_dauer):
+            t = np.arange(int(dauer * SAMPLE_RATE)) / SAMPLE_RATE
+            f0 = 110 + 40 * np.sin(2 * np.pi * 0.3 * t + rng.uniform(0, np.pi))
+            phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+            stimme = sum(np.sin(k * phase) / k for k in range(1, 6))
+            silben = np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * t), 0, None)
+            signal = 0.3 * stimme * silben + 0.02 * rng.standard_normal(len(t))
+            pcm = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+
+            pfad = ziel / f"synth_{dauer:g}s_{i:02d}.wav"
+            with wave.open(str(pfad), "wb") as w:
+                w.setnchannels(1)
+                w.setsampwidth(2)
+                w.setframerate(SAMPLE_RATE)
+                w.writeframes(pcm.tobytes())
+            dateien.append(pfad)
+    return dateien
+
+
+def perzentil(werte: list, p: float) -> float:
+    """Nearest-Rank-Perzentil, ausreichend für kleine Stichproben."""
+    if not werte:
+        return 0.0
+    werte = sorted(werte)
+    return werte[max(0, math.ceil(p / 100 * len(werte)) - 1)]
+
+
+def _rss_mb(wer: str):
+    """Spitzen-RSS in MB für RUSAGE_SELF bzw. RUSAGE_CHILDREN (None unter Windows)."""
+    if resource is None:
+        return None
+    kb = resource.getrusage(getattr(resource, wer)).ru_maxrss
+    # macOS liefert Bytes, Linux Kilobytes
+    return round(kb / 1_048_576 if sys.platform == "darwin" else kb / 1024, 1)
+
+
+def _messe_konfiguration(dateien: list, model_name: str, workers: int, threads: int,
+                         fenster_sek: float, ausgabe: mp.Queue):
+    """Läuft in einem frischen Prozess, damit RSS-Spitzen nicht zwischen Läufen mitwandern."""
+    einstellungen = rwa.erstelle_einstellungen(fenster_sek=fenster_sek)
+    bereit = []
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        ergebnisse = list(rwa.transkribiere_alle(dateien, model_name, workers, threads,
+                                                 einstellungen, output_dir=Path(tmp),
+                                                 bereit_callback=lambda: bereit.append(time.perf_counter())))
+        ende = time.perf_counter()
+    # Modell laden bzw. Pool hochfahren getrennt ausweisen; RTF zählt nur die Transkription
+    start_sek = bereit[0] - start if bereit else 0.0
+    wall = ende - start - start_sek
+
+    ok = [r for r in ergebnisse if r["ok"]]
+    latenzen = [r["sekunden"] for r in ok]
+    audio_sek = sum(r["audio_sek"] for r in ok)
+    ausgabe.put({
+        "model": model_name,
+        "workers": workers,
+        "threads": threads,
+        "fenster_sek": fenster_sek,
+        "dateien": len(ok),
+        "fehler": len(ergebnisse) - len(ok),
+        "audio_sek": round(audio_sek, 2),
+        "start_sek": round(start_sek, 2),
+        "wall_sek": round(wall, 2),
+        # RTF < 1 heißt schneller als Echtzeit
+        "rtf": round(wall / audio_sek, 4) if audio_sek else None,
+        "audio_sek_pro_sek": round(audio_sek / wall, 3) if wall else None,
+        "latenz_p50_sek": round(perzentil(latenzen, 50), 3),
+        "latenz_p95_sek": round(perzentil(latenzen, 95), 3),
+        "latenz_max_sek": round(max(latenzen, default=0.0), 3),
+        "rss_haupt_mb": _rss_mb("RUSAGE_SELF"),
+        # Ohne Pool wäre das größte Kind nur ffmpeg, daher dann kein Wert
+        "rss_worker_max_mb": _rss_mb("RUSAGE_CHILDREN") if workers > 1 else None,
+    })
+
+
+def schreibe_bericht(zeilen: list, ziel: Path):
+    ziel.parent.mkdir(parents=True, exist_ok=True)
+    with open(ziel.with_suffix(".json"), "w", encoding="utf-8") as f:
+        json.dump(zeilen, f, indent=2)
+    with open(ziel.with_suffix(".csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(zeilen[0]))
+        writer.writeheader()
+        writer.writerows(zeilen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der Whisper-Transkription")
+    parser.add_argument("--models", default="base", help="Kommagetrennt, z. B. base,small,medium")
+    parser.add_argument("--workers", default="1", help="Kommagetrennt, z. B. 1,2,4")
+    parser.add_argument("--threads", default="0",
+                        help="Kommagetrennt, Torch-Threads pro Worker (0 = automatisch), z. B. 0,2,4")
+    parser.add_argument("--corpus", type=Path, default=None,
+                        help="Ordner mit eigenen wav/mp3 statt des synthetischen Korpus")
+    parser.add_argument("--durations", default="10,30,120",
+                        help="Dauern der synthetischen Dateien in Sekunden")
+    parser.add_argument("--files-per-duration", type=int, default=2)
+    parser.add_argument("--chunk-seconds", type=float, default=0.0,
+                        help="Streaming-Modus mitmessen (0 = aus)")
+    parser.add_argument("--out", type=Path, default=Path("bench_whisper"),
+                        help="Berichtsname ohne Endung; es entstehen .json und .csv")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as korpus_tmp:
+        if args.corpus:
+            dateien = rwa.finde_audiodateien(args.corpus)
+        else:
+            dauern = [float(d) for d in args.durations.split(",")]
+            dateien = erzeuge_korpus(Path(korpus_tmp), dauern, args.files_per_duration)
+        if not dateien:
+            print("⚠️ Keine Audiodateien für den Benchmark gefunden.")
+            return
+        print(f"🧪 Korpus: {len(dateien)} Datei(en)")
+
+        ctx = mp.get_context("spawn")
+        zeilen = []
+        for model_name in args.models.split(","):
+            for workers in (int(w) for w in args.workers.split(",")):
+                for threads in (int(t) for t in args.threads.split(",")):
+                    print(f"\n⏱️ {model_name} mit {workers} Worker(n), {threads or 'auto'} Thread(s)...")
+                    ergebnis = ctx.Queue()
+                    proc = ctx.Process(target=_messe_konfiguration,
+                                       args=(dateien, model_name, workers, threads,
+                                             args.chunk_seconds, ergebnis))
+                    proc.start()
+                    zeile = None
+                    while zeile is None and proc.is_alive():
+                        try:
+                            zeile = ergebnis.get(timeout=1)
+                        except queue.Empty:
+                            pass
+                    if zeile is None and not ergebnis.empty():
+                        zeile = ergebnis.get()
+                    proc.join()
+                    if zeile is None:
+                        print(f"❌ Lauf abgebrochen (Exitcode {proc.exitcode})")
+                        continue
+                    zeilen.append(zeile)
+                    print(f"   Start {zeile['start_sek']} s  RTF {zeile['rtf']}  p50 {zeile['latenz_p50_sek']} s  "
+                          f"p95 {zeile['latenz_p95_sek']} s  RSS {zeile['rss_haupt_mb']} MB")
+
+    if not zeilen:
+        print("❌ Keine Messwerte.")
+        return
+    schreibe_bericht(zeilen, args.out)
+    print(f"\n📄 Bericht gespeichert: {args.out.with_suffix('.json')}, {args.out.with_suffix('.csv')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# faq_cluster.py
+"""
+FAQ-Kandidaten aus Transkripten
+Liest die .txt-Dateien aus `transcripts`, extrahiert Fragesätze samt nachfolgender
+Antwort und fasst nahezu gleiche Fragen per MinHash/LSH zusammen – ohne jede Frage
+mit jeder anderen zu vergleichen. Ergebnis ist eine JSON-Datei im Schema von
+calls_full_faq_v2.json ({question, answer}) plus Häufigkeit je Cluster.
+
+Beispiel:
+    python faq_cluster.py --threshold 0.6 --out faq_candidates.json
+"""
+import argparse
+import json
+import re
+import zlib
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from faq_retrieval import normalisiere
+
+BASE_DIR = Path(__file__).resolve().parent
+TRANSCRIPTS_DIR = BASE_DIR.parent / "transcripts"   # gleicher Ordner wie in run_whisper_auto.py
+OUTPUT_FILE = BASE_DIR / "faq_candidates.json"
+
+NUM_PERM = 128
+BANDS = 32            # 32 Bänder à 4 Zeilen -> Kandidatenschwelle ca. Jaccard 0.42
+PRIME = (1 << 31) - 1
+
+# Satzende nur vor Leerraum, damit "150.000" nicht als zwei Sätze gilt
+_SATZ = re.compile(r".+?(?:[.!?]+(?=\s|$)|$)", re.S)
+_FRAGE = re.compile(r"¿[^?¿]+\?|[^.!?¿¡]+\?")
+
+
+def extrahiere_kandidaten(text: str, max_antwort_saetze: int = 2) -> list:
+    """Fragesätze plus die unmittelbar folgenden Sätze als Antwort."""
+    kandidaten = []
+    for treffer in _FRAGE.finditer(text):
+        frage = treffer.group().strip()
+        if len(frage.split()) < 3:
+            continue  # "¿Sí?", "¿Vale?" usw.
+        rest = text[treffer.end():]
+        antwort = []
+        for satz in _SATZ.findall(rest):
+            satz = satz.strip()
+            if not satz:
+                continue
+            if satz.endswith("?"):
+                break  # nächste Frage beginnt
+            antwort.append(satz)
+            if len(antwort) >= max_antwort_saetze:
+                break
+        kandidaten.append({"question": frage, "answer": " ".join(antwort)})
+    return kandidaten
+
+
+def shingles(text: str, n: int = 4) -> np.ndarray:
+    """Zeichen-n-Gramme des normalisierten Textes als uint32-Hashes."""
+    t = " ".join(re.findall(r"\w+", normalisiere(text)))
+    if len(t) < n:
+        t = t.ljust(n)
+    return np.array(sorted({zlib.crc32(t[i:i + n].encode("utf-8")) for i in range(len(t) - n + 1)}),
+                    dtype=np.uint64)
+
+
+def minhash_signaturen(texte: list, num_perm: int = NUM_PERM, seed: int = 1) -> np.ndarray:
+    """MinHash-Signaturen (len(texte) x num_perm) mit h(x) = (a*x + b) mod p."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, PRIME, num_perm, dtype=np.uint64)
+    b = rng.integers(0, PRIME, num_perm, dtype=np.uint64)
+    signaturen = np.empty((len(texte), num_perm), dtype=np.uint64)
+    for i, text in enumerate(texte):
+        x = shingles(text)
+        # a < 2^31 und x < 2^32, das Produkt passt also in uint64
+        signaturen[i] = ((np.outer(x, a) + b) % PRIME).min(axis=0)
+    return signaturen
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.eltern = list(range(n))
+
+    def finde(self, i: int) -> int:
+        while self.eltern[i] != i:
+            self.eltern[i] = self.eltern[self.eltern[i]]
+            i = self.eltern[i]
+        return i
+
+    def vereinige(self, i: int, j: int):
+        self.eltern[self.finde(i)] = self.finde(j)
+
+
+def clustere(texte: list, threshold: float = 0.6, bands: int = BANDS) -> list:
+    """LSH-Banding: nur Texte mit identischem Band werden verglichen (erwartet ~O(n)).
+
+    Kandidatenpaare werden über die geschätzte Jaccard-Ähnlichkeit der Signaturen
+    bestätigt. Gibt eine Liste von Index-Listen zurück.
+    """
+    if not texte:
+        return []
+    signaturen = minhash_signaturen(texte)
+    zeilen = signaturen.shape[1] // bands
+    uf = _UnionFind(len(texte))
+    for band in range(bands):
+        eimer = defaultdict(list)
+        abschnitt = signaturen[:, band * zeilen:(band + 1) * zeilen]
+        for i, schluessel in enumerate(abschnitt):
+            eimer[schluessel.tobytes()].append(i)
+        for mitglieder in eimer.values():
+            erster = mitglieder[0]
+            for j in mitglieder[1:]:
+                if uf.finde(erster) == uf.finde(j):
+                    continue
+                if np.mean(signaturen[erster] == signaturen[j]) >= threshold:
+                    uf.vereinige(erster, j)
+
+    cluster = defaultdict(list)
+    for i in range(len(texte)):
+        cluster[uf.finde(i)].append(i)
+    return list(cluster.values())
+
+
+def baue_faq_kandidaten(transcripts_dir: Path, threshold: float = 0.6, min_count: int = 1) -> list:
+    kandidaten = []
+    for txt in sorted(transcripts_dir.glob("*.txt")):
+        for k in extrahiere_kandidaten(txt.read_text(encoding="utf-8")):
+            k["quelle"] = txt.name
+            kandidaten.append(k)
+    print(f"🔍 {len(kandidaten)} Fragekandidaten aus {transcripts_dir}")
+
+    faq = []
+    for mitglieder in clustere([k["question"] for k in kandidaten], threshold):
+        if len(mitglieder) < min_count:
+            continue
+        # Häufigste Formulierung als Vertreter, Antwort von der längsten Antwort im Cluster
+        formulierungen = Counter(kandidaten[i]["question"] for i in mitglieder)
+        frage = formulierungen.most_common(1)[0][0]
+        antwort = max((kandidaten[i]["answer"] for i in mitglieder), key=len)
+        faq.append({"question": frage, "answer": antwort, "count": len(mitglieder),
+                    "sources": sorted({kandidaten[i]["quelle"] for i in mitglieder})})
+    faq.sort(key=lambda e: (-e["count"], e["question"]))
+    return faq
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAQ-Kandidaten aus Transkripten clustern")
+    parser.add_argument("--transcripts", type=Path, default=TRANSCRIPTS_DIR)
+    parser.add_argument("--threshold", type=float, default=0.6,
+                        help="Geschätzte Jaccard-Ähnlichkeit, ab der Fragen zusammengefasst werden")
+    parser.add_argument("--min-count", type=int, default=1, help="Nur Cluster mit mindestens so vielen Fragen")
+    parser.add_argument("--out", type=Path, default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    faq = baue_faq_kandidaten(args.transcripts, args.threshold, args.min_count)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(faq, f, ensure_ascii=False, indent=2)
+    print(f"✅ {len(faq)} FAQ-Kandidaten gespeichert unter: {args.out.name}")
+
+
+if __name__ == "__main__":
+    main()
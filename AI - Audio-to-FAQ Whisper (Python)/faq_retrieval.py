@@ -0,0 +1,190 @@
+# faq_retrieval.py
+"""
+FAQ-Suche über calls_full_faq_v2.json
+Vektorisiert alle `question`-Felder einmal zu einer TF-IDF-Matrix (gehashte Wort- und
+Zeichen-Trigramm-Merkmale), legt sie als memory-mappbare .npy-Dateien ab und
+beantwortet Anfragen – auch viele auf einmal – mit einer einzigen Matrixmultiplikation.
+
+Beispiel:
+    python faq_retrieval.py "¿Cuánto cuesta una casa?" "¿Buscáis terreno?" -k 3
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import unicodedata
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent
+FAQ_FILE = BASE_DIR / "calls_full_faq_v2.json"
+
+DIM = 1 << 14  # Anzahl Hash-Buckets je Vektor
+INDEX_VERSION = 1
+
+_WORT = re.compile(r"\w+")
+
+
+def normalisiere(text: str) -> str:
+    """Kleinschreibung ohne Akzente, damit "Cuánto" und "cuanto" gleich zählen."""
+    zerlegt = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in zerlegt if not unicodedata.combining(c))
+
+
+def merkmale(text: str) -> list:
+    """Wörter plus Zeichen-Trigramme je Wort (robust gegen Tippfehler und Flexion)."""
+    woerter = _WORT.findall(normalisiere(text))
+    result = [f"w:{w}" for w in woerter]
+    for w in woerter:
+        w = f"#{w}#"
+        result.extend(f"c:{w[i:i + 3]}" for i in range(len(w) - 2))
+    return result
+
+
+def vektorisiere(texte: list, dim: int = DIM) -> np.ndarray:
+    """Roh-Termfrequenzen (log1p) als dichte Matrix len(texte) x dim."""
+    matrix = np.zeros((len(texte), dim), dtype=np.float32)
+    for zeile, text in enumerate(texte):
+        # crc32 statt hash(): stabil über Prozesse und Python-Läufe hinweg
+        spalten = [zlib.crc32(m.encode("utf-8")) % dim for m in merkmale(text)]
+        np.add.at(matrix[zeile], spalten, 1.0)
+    return np.log1p(matrix, out=matrix)
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _speichere_npy(pfad: Path, array: np.ndarray):
+    tmp = pfad.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, pfad)
+
+
+class FAQIndex:
+    """Persistenter Suchindex über die Fragen einer FAQ-JSON-Datei.
+
+    Im Index-Ordner liegen:
+        roh.npy     – ungewichtete Termvektoren je Frage (Basis für inkrementelle Updates)
+        matrix.npy  – TF-IDF-gewichtet und L2-normiert, wird per mmap gelesen
+        idf.npy     – IDF-Gewichte für die Anfragen
+        meta.json   – Hash der Quelldatei und je Frage ein Text-Hash
+    Ändert sich die JSON-Datei, werden nur neue oder geänderte Fragen neu vektorisiert.
+    """
+
+    def __init__(self, faq_file: Path = FAQ_FILE, index_dir: Path = None, dim: int = DIM):
+        self.faq_file = Path(faq_file)
+        self.index_dir = Path(index_dir) if index_dir else self.faq_file.with_name(self.faq_file.stem + "_index")
+        self.dim = dim
+        self.eintraege = []
+        self.matrix = None
+        self.idf = None
+        self.aktualisiere()
+
+    def aktualisiere(self) -> bool:
+        """Baut den Index neu, falls sich die JSON-Datei geändert hat. Gibt True bei Neuaufbau zurück."""
+        roh_json = self.faq_file.read_bytes()
+        quelle_sha = hashlib.sha256(roh_json).hexdigest()
+        self.eintraege = json.loads(roh_json)
+        meta = self._lade_meta()
+
+        neu_gebaut = False
+        if not (meta and meta["quelle_sha256"] == quelle_sha and meta["dim"] == self.dim
+                and meta["version"] == INDEX_VERSION):
+            self.matrix = None  # altes mmap schließen, bevor matrix.npy ersetzt wird
+            self._baue(meta)
+            meta = {"version": INDEX_VERSION, "quelle_sha256": quelle_sha, "dim": self.dim,
+                    "fragen": [_text_hash(e["question"]) for e in self.eintraege]}
+            with open(self.index_dir / "meta.json", "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            neu_gebaut = True
+
+        self.matrix = np.load(self.index_dir / "matrix.npy", mmap_mode="r")
+        self.idf = np.load(self.index_dir / "idf.npy")
+        return neu_gebaut
+
+    def _lade_meta(self):
+        try:
+            with open(self.index_dir / "meta.json", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _baue(self, meta):
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        fragen = [e["question"] for e in self.eintraege]
+        hashes = [_text_hash(q) for q in fragen]
+
+        # Bereits vektorisierte Fragen aus dem alten Index übernehmen
+        alt = {}
+        roh_pfad = self.index_dir / "roh.npy"
+        if meta and meta.get("dim") == self.dim and roh_pfad.exists():
+            alte_roh = np.load(roh_pfad, mmap_mode="r")
+            alt = {h: alte_roh[i] for i, h in enumerate(meta["fragen"]) if i < len(alte_roh)}
+
+        fehlend = [i for i, h in enumerate(hashes) if h not in alt]
+        neue_vektoren = vektorisiere([fragen[i] for i in fehlend], self.dim)
+        roh = np.empty((len(fragen), self.dim), dtype=np.float32)
+        for i, h in enumerate(hashes):
+            if h in alt:
+                roh[i] = alt[h]
+        roh[fehlend] = neue_vektoren
+        alt = alte_roh = None  # mmap freigeben, bevor roh.npy ersetzt wird (Windows)
+
+        # IDF über alle Fragen, dann zeilenweise L2-Normierung
+        df = np.count_nonzero(roh, axis=0)
+        idf = (np.log((1 + len(fragen)) / (1 + df)) + 1).astype(np.float32)
+        matrix = roh * idf
+        normen = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.maximum(normen, 1e-12)
+
+        _speichere_npy(roh_pfad, roh)
+        _speichere_npy(self.index_dir / "idf.npy", idf)
+        _speichere_npy(self.index_dir / "matrix.npy", matrix)
+        print(f"🔧 FAQ-Index aufgebaut: {len(fragen)} Fragen, {len(fehlend)} neu vektorisiert")
+
+    def _anfrage_matrix(self, anfragen: list) -> np.ndarray:
+        q = vektorisiere(anfragen, self.dim) * self.idf
+        q /= np.maximum(np.linalg.norm(q, axis=1, keepdims=True), 1e-12)
+        return q
+
+    def suche_batch(self, anfragen: list, k: int = 3) -> list:
+        """Top-k-Treffer für viele Anfragen: eine (B x dim) @ (dim x N)-Multiplikation."""
+        if not anfragen or len(self.eintraege) == 0:
+            return [[] for _ in anfragen]
+        k = min(k, len(self.eintraege))
+        scores = self._anfrage_matrix(anfragen) @ self.matrix.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        ergebnisse = []
+        for zeile, kandidaten in enumerate(top):
+            kandidaten = kandidaten[np.argsort(-scores[zeile, kandidaten])]
+            ergebnisse.append([{"question": self.eintraege[i]["question"],
+                                "answer": self.eintraege[i]["answer"],
+                                "score": float(scores[zeile, i])} for i in kandidaten])
+        return ergebnisse
+
+    def suche(self, anfrage: str, k: int = 3) -> list:
+        return self.suche_batch([anfrage], k)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAQ-Suche über calls_full_faq_v2.json")
+    parser.add_argument("anfragen", nargs="+", help="Eine oder mehrere Kundenäußerungen")
+    parser.add_argument("-k", type=int, default=3, help="Anzahl Treffer je Anfrage")
+    parser.add_argument("--faq", type=Path, default=FAQ_FILE, help="FAQ-JSON mit question/answer")
+    args = parser.parse_args()
+
+    index = FAQIndex(args.faq)
+    for anfrage, treffer in zip(args.anfragen, index.suche_batch(args.anfragen, args.k)):
+        print(f"\n🔎 {anfrage}")
+        for t in treffer:
+            print(f"   {t['score']:.3f}  {t['question']}")
+            print(f"          ↳ {t['answer']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,639 @@
 # run_whisper_auto.py
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
 import os
-import whisper
+import signal
+import subprocess
+import threading
+import time
 from pathlib import Path
 
-print("🔁 Starte automatische Transkription...")
+import numpy as np
+import torch
+import whisper
 
 # 1. Basisverzeichnis berechnen
 BASE_DIR = Path(__file__).resolve().parent.parent
 AUDIO_DIR = BASE_DIR / "audio_nuevo"
 OUTPUT_DIR = BASE_DIR / "transcripts"
+MANIFEST_FILE = OUTPUT_DIR / "manifest.json"
+CACHE_DIR = BASE_DIR / "audio_cache"
+
+MODEL_NAME = "base"
+
+# Im Worker-Prozess einmal geladenes Modell (siehe _init_worker)
+_worker_model = None
+_worker_einstellungen = {}
+_worker_cache = None
+_worker_output_dir = OUTPUT_DIR
+
+
+def lade_modell(model_name: str, threads: int = 0):
+    """Lädt das Whisper-Modell; threads > 0 begrenzt die Torch-Threads des Prozesses."""
+    if threads > 0:
+        torch.set_num_threads(threads)
+    return whisper.load_model(model_name)
+
+
+def finde_audiodateien(audio_dir: Path) -> list:
+    return sorted(list(audio_dir.glob("*.wav")) + list(audio_dir.glob("*.mp3")))
+
+
+def datei_hash(file_path: Path) -> str:
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def lade_manifest(manifest_file: Path = MANIFEST_FILE) -> dict:
+    """Manifest: Dateiname -> Hash, Modell, Decode-Optionen und Transkript."""
+    if manifest_file.exists():
+        try:
+            with open(manifest_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            print("⚠️ Manifest beschädigt, starte mit leerem Manifest.")
+    return {}
+
+
+def speichere_manifest(manifest: dict, manifest_file: Path = MANIFEST_FILE):
+    # Erst in temporäre Datei schreiben, dann atomar ersetzen (absturzsicher)
+    tmp = manifest_file.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, manifest_file)
+
+
+def ist_aktuell(eintrag: dict, sha256: str, model_name: str, einstellungen: dict, output_dir: Path) -> bool:
+    return (eintrag is not None
+            and eintrag.get("sha256") == sha256
+            and eintrag.get("model") == model_name
+            and eintrag.get("einstellungen") == einstellungen
+            and (output_dir / eintrag.get("transkript", "")).is_file()
+            and (not einstellungen.get("jsonl")
+                 or (output_dir / Path(eintrag["transkript"]).with_suffix(".jsonl")).is_file()))
+
+
+def _starte_ffmpeg(file_path: Path) -> subprocess.Popen:
+    # Gleiche Parameter wie whisper.load_audio, nur als Stream gelesen
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0", "-i", str(file_path),
+           "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le",
+           "-ar", str(whisper.audio.SAMPLE_RATE), "-"]
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+
+def raeume_cache_auf(cache_dir: Path, max_bytes: int, behalten: Path = None):
+    """LRU-Verdrängung: älteste Zugriffe (mtime) löschen, bis der Cache unter max_bytes liegt."""
+    eintraege = []
+    for p in cache_dir.glob("*.f32"):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        eintraege.append((st.st_mtime, st.st_size, p))
+    gesamt = sum(e[1] for e in eintraege)
+    for _, groesse, p in sorted(eintraege):
+        if gesamt <= max_bytes:
+            break
+        if p == behalten:
+            continue
+        try:
+            p.unlink()
+            gesamt -= groesse
+        except OSError:
+            pass  # z. B. unter Windows gerade von einem anderen Worker gemappt
+
+
+def lade_audio_gecacht(file_path: Path, sha256: str, cache: dict) -> np.ndarray:
+    """Liefert die dekodierte 16-kHz-Wellenform als schreibgeschütztes np.memmap.
+
+    Der Cache liegt als rohes float32 unter <sha256>.f32; beim ersten Zugriff wird
+    blockweise aus der ffmpeg-Pipe geschrieben, danach entfällt das Dekodieren.
+    """
+    cache_dir = cache["ordner"]
+    ziel = cache_dir / f"{sha256}.f32"
+    if ziel.exists():
+        os.utime(ziel)  # Zugriff für die LRU-Verdrängung merken
+    else:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cache_dir / f"{sha256}.{os.getpid()}.tmp"
+        proc = _starte_ffmpeg(file_path)
+        try:
+            with open(tmp, "wb") as f:
+                for block in iter(lambda: proc.stdout.read(1 << 20), b""):
+                    f.write((np.frombuffer(block, np.int16).astype(np.float32) / 32768.0).tobytes())
+        finally:
+            proc.stdout.close()
+            proc.wait()
+        if proc.returncode != 0:
+            tmp.unlink(missing_ok=True)
+            raise RuntimeError(f"ffmpeg konnte {file_path.name} nicht dekodieren")
+        os.replace(tmp, ziel)
+        raeume_cache_auf(cache_dir, cache["max_bytes"], behalten=ziel)
+    if ziel.stat().st_size == 0:
+        return np.zeros(0, dtype=np.float32)
+    return np.memmap(ziel, dtype=np.float32, mode="r")
+
+
+def _array_fenster(audio: np.ndarray, fenster: int, schritt: int):
+    sr = whisper.audio.SAMPLE_RATE
+    for offset in range(0, len(audio), schritt):
+        letztes = offset + fenster >= len(audio)
+        # Kopie nur des Fensters – vom memmap wird nie mehr als ein Fenster gelesen
+        yield offset / sr, np.array(audio[offset:offset + fenster]), letztes
+        if letztes:
+            break
+
+
+def audio_fenster(file_path: Path, fenster_sek: float, ueberlappung_sek: float, audio: np.ndarray = None):
+    """Liefert (start_sek, samples, ist_letztes) je Fenster, aus dem Cache-Array
+    oder direkt aus der ffmpeg-Pipe.
+
+    Es liegt immer nur ein Fenster im Speicher, unabhängig von der Länge der Aufnahme.
+    """
+    sr = whisper.audio.SAMPLE_RATE
+    fenster = int(fenster_sek * sr)
+    schritt = fenster - int(ueberlappung_sek * sr)
+    if audio is not None:
+        yield from _array_fenster(audio, fenster, schritt)
+        return
+
+    proc = _starte_ffmpeg(file_path)
+    try:
+        rest = np.zeros(0, dtype=np.float32)
+        offset = 0
+        while True:
+            benoetigt = (fenster - len(rest)) * 2
+            roh = proc.stdout.read(benoetigt)
+            neu = np.frombuffer(roh, np.int16).astype(np.float32) / 32768.0
+            stueck = np.concatenate([rest, neu])
+            if len(stueck) == 0:
+                break
+            letztes = len(roh) < benoetigt
+            yield offset / sr, stueck, letztes
+            if letztes:
+                break
+            rest = stueck[schritt:]
+            offset += schritt
+    except BaseException:
+        # Auch bei vorzeitigem Abbruch des Generators ffmpeg beenden
+        proc.kill()
+        raise
+    finally:
+        proc.stdout.close()
+        proc.wait()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg konnte {file_path.name} nicht dekodieren")
+
+
+def segment_zeile(seg: dict, start_sek: float = 0.0) -> str:
+    """Ein Whisper-Segment als JSONL-Zeile mit absoluten Zeitstempeln."""
+    return json.dumps({
+        "start": round(start_sek + seg["start"], 2),
+        "end": round(start_sek + seg["end"], 2),
+        "text": seg["text"].strip(),
+        "avg_logprob": round(seg["avg_logprob"], 4),
+        "no_speech_prob": round(seg["no_speech_prob"], 4),
+    }, ensure_ascii=False) + "\n"
+
+
+def schneide_segmente(segmente: list, von: float, bis: float) -> list:
+    """Behält je Segment nur die Wörter, deren Mitte in [von, bis) liegt (Sekunden relativ
+    zum Fenster), und setzt Text und Zeiten des Segments daraus neu zusammen.
+
+    Die Schnittstelle liegt in der Mitte der Überlappung; Wörter dort sind in beiden
+    Fenstern vollständig enthalten und landen so genau einmal im Transkript.
+    """
+    ergebnis = []
+    for seg in segmente:
+        woerter = seg.get("words")
+        if not woerter:
+            # Ohne Wortzeiten (z. B. reine Stille) entscheidet die Segmentmitte
+            if von <= (seg["start"] + seg["end"]) / 2 < bis:
+                ergebnis.append(seg)
+            continue
+        behalten = [w for w in woerter if von <= (w["start"] + w["end"]) / 2 < bis]
+        if behalten:
+            ergebnis.append({**seg, "start": behalten[0]["start"], "end": behalten[-1]["end"],
+                             "text": "".join(w["word"] for w in behalten), "words": behalten})
+    return ergebnis
+
+
+def transkribiere_gestreamt(model, file_path: Path, output_file: Path, einstellungen: dict,
+                            audio: np.ndarray = None) -> float:
+    """Transkribiert Fenster für Fenster und hängt den Text laufend an output_file an.
+
+    Überlappende Fenster werden auf Wortebene in der Mitte der Überlappung geschnitten
+    (siehe schneide_segmente). Mit einstellungen["jsonl"]
+    wird jedes Segment zusätzlich sofort nach <stem>.jsonl geschrieben.
+    Gibt die Audiodauer zurück.
+    """
+    fenster_sek = einstellungen["fenster_sek"]
+    halbe_ueberlappung = einstellungen["ueberlappung_sek"] / 2
+    optionen = einstellungen["optionen"]
+    audio_sek = 0.0
+    vorheriger_text = ""
+    jsonl = open(output_file.with_suffix(".jsonl"), "w", encoding="utf-8") if einstellungen.get("jsonl") else None
+    try:
+        with open(output_file, "w", encoding="utf-8") as f:
+            for start_sek, samples, letztes in audio_fenster(file_path, fenster_sek,
+                                                             einstellungen["ueberlappung_sek"], audio):
+                # Ende des vorherigen Fensters als Kontext, damit Sätze sauber weiterlaufen
+                result = model.transcribe(samples, initial_prompt=vorheriger_text[-200:] or None,
+                                          word_timestamps=True, **optionen)
+                von = halbe_ueberlappung if start_sek > 0 else float("-inf")
+                bis = float("inf") if letztes else fenster_sek - halbe_ueberlappung
+                segmente = schneide_segmente(result["segments"], von, bis)
+                text = "".join(seg["text"] for seg in segmente)
+                f.write(text)
+                f.flush()
+                if jsonl is not None:
+                    jsonl.writelines(segment_zeile(seg, start_sek) for seg in segmente)
+                    jsonl.flush()
+                vorheriger_text += text
+                audio_sek = start_sek + len(samples) / whisper.audio.SAMPLE_RATE
+    finally:
+        if jsonl is not None:
+            jsonl.close()
+    return audio_sek
+
+
+def transkribiere_datei(model, file_path: Path, output_dir: Path, einstellungen: dict,
+                        cache: dict = None, sha256: str = None) -> dict:
+    """Transkribiert eine Datei, speichert <stem>.txt und gibt Kennzahlen zurück."""
+    start = time.perf_counter()
+    # Speichern unter dem gleichen Namen, aber als .txt
+    output_file = output_dir / (file_path.stem + ".txt")
+    try:
+        audio = None
+        if cache is not None:
+            audio = lade_audio_gecacht(file_path, sha256 or datei_hash(file_path), cache)
+        if einstellungen["fenster_sek"] > 0:
+            audio_sek = transkribiere_gestreamt(model, file_path, output_file, einstellungen, audio)
+        else:
+            audio = np.array(audio) if audio is not None else whisper.load_audio(str(file_path))
+            result = model.transcribe(audio, **einstellungen["optionen"])
+            with open(output_file, "w", encoding="utf-8") as f:
+                f.write(result["text"])
+            audio_sek = len(audio) / whisper.audio.SAMPLE_RATE
+    except Exception as e:
+        return {"datei": file_path.name, "ok": False, "fehler": str(e),
+                "audio_sek": 0.0, "sekunden": time.perf_counter() - start}
 
-# 2. Ausgabeordner sicherstellen
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    return {"datei": file_path.name, "ok": True, "ausgabe": output_file.name,
+            "audio_sek": audio_sek, "sekunden": time.perf_counter() - start}
 
-# 3. Whisper-Modell laden (lokal)
-print("📥 Lade Whisper-Modell...")
-model = whisper.load_model("base")
 
-# 4. Alle Audiodateien im Ordner durchgehen
-audio_files = list(AUDIO_DIR.glob("*.wav")) + list(AUDIO_DIR.glob("*.mp3"))
+def lade_kurzclip(file_path: Path, cache: dict = None, sha256: str = None):
+    """Lädt das Audio nur, wenn es in ein Whisper-Fenster (30 s) passt, sonst None.
 
-if not audio_files:
-    print("⚠️ Keine Audiodateien im Verzeichnis gefunden.")
-else:
-    for file_path in audio_files:
-        print(f"🎧 Verarbeite: {file_path.name}")
+    Ohne Cache dekodiert ffmpeg höchstens 30 s plus einen Rest, lange Aufnahmen
+    werden also nie vollständig in den Speicher geholt.
+    """
+    limit = whisper.audio.N_SAMPLES
+    if cache is not None:
+        audio = lade_audio_gecacht(file_path, sha256 or datei_hash(file_path), cache)
+        return np.array(audio) if len(audio) <= limit else None
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0", "-i", str(file_path),
+           "-t", str(whisper.audio.CHUNK_LENGTH + 1),
+           "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le",
+           "-ar", str(whisper.audio.SAMPLE_RATE), "-"]
+    roh = subprocess.run(cmd, capture_output=True, check=True).stdout
+    if len(roh) // 2 > limit:
+        return None
+    return np.frombuffer(roh, np.int16).astype(np.float32) / 32768.0
 
-        # 5. Transkription starten
-        result = model.transcribe(str(file_path))
 
-        # 6. Speichern unter dem gleichen Namen, aber als .txt
-        output_file = OUTPUT_DIR / (file_path.stem + ".txt")
+def transkribiere_stapel(model, auftraege: list, output_dir: Path, einstellungen: dict,
+                         cache: dict = None) -> list:
+    """Dekodiert kurze Clips gemeinsam in einem Forward-Pass.
+
+    Die Log-Mel-Spektrogramme aller Clips ≤ 30 s werden gepolstert, gestapelt und
+    mit einem whisper.decode-Aufruf verarbeitet; längere Dateien laufen einzeln
+    über transkribiere_datei. Jede Datei bekommt weiterhin ihre eigene .txt.
+    """
+    ergebnisse, kurz = [], []
+    for file_path, sha256 in auftraege:
+        start = time.perf_counter()
+        try:
+            audio = lade_kurzclip(file_path, cache, sha256)
+        except Exception as e:
+            ergebnisse.append({"datei": file_path.name, "ok": False, "fehler": str(e),
+                               "audio_sek": 0.0, "sekunden": time.perf_counter() - start})
+            continue
+        if audio is None:
+            ergebnisse.append(transkribiere_datei(model, file_path, output_dir, einstellungen, cache, sha256))
+        else:
+            kurz.append((file_path, audio, start))
+    if not kurz:
+        return ergebnisse
+
+    try:
+        mels = torch.stack([whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), model.dims.n_mels)
+                            for _, audio, _ in kurz]).to(model.device)
+        optionen = whisper.DecodingOptions(fp16=model.device.type == "cuda", **einstellungen["optionen"])
+        dekodiert = whisper.decode(model, mels, optionen)
+    except Exception as e:
+        return ergebnisse + [{"datei": p.name, "ok": False, "fehler": str(e), "audio_sek": 0.0,
+                              "sekunden": time.perf_counter() - start} for p, _, start in kurz]
+
+    for (file_path, audio, start), res in zip(kurz, dekodiert):
+        output_file = output_dir / (file_path.stem + ".txt")
+        audio_sek = len(audio) / whisper.audio.SAMPLE_RATE
         with open(output_file, "w", encoding="utf-8") as f:
-            f.write(result["text"])
+            f.write(res.text)
+        if einstellungen.get("jsonl"):
+            segment = {"start": 0.0, "end": audio_sek, "text": res.text,
+                       "avg_logprob": res.avg_logprob, "no_speech_prob": res.no_speech_prob}
+            with open(output_file.with_suffix(".jsonl"), "w", encoding="utf-8") as f:
+                f.write(segment_zeile(segment))
+        ergebnisse.append({"datei": file_path.name, "ok": True, "ausgabe": output_file.name,
+                           "audio_sek": audio_sek, "sekunden": time.perf_counter() - start})
+    return ergebnisse
+
+
+def verarbeite_auftraege(model, auftraege: list, output_dir: Path, einstellungen: dict,
+                         cache: dict = None) -> list:
+    if einstellungen.get("stapel"):
+        return transkribiere_stapel(model, auftraege, output_dir, einstellungen, cache)
+    return [transkribiere_datei(model, file_path, output_dir, einstellungen, cache, sha256)
+            for file_path, sha256 in auftraege]
+
+
+def _init_worker(model_name: str, threads: int, einstellungen: dict, cache: dict, output_dir: Path,
+                 bereit=None):
+    global _worker_model, _worker_einstellungen, _worker_cache, _worker_output_dir
+    # Strg+C behandelt nur der Hauptprozess; Worker beenden ihre Datei regulär
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_model = lade_modell(model_name, threads)
+    _worker_einstellungen = einstellungen
+    _worker_cache = cache
+    _worker_output_dir = output_dir
+    if bereit is not None:
+        bereit.put(os.getpid())
+
+
+def _worker_verarbeite(auftraege: list) -> list:
+    return verarbeite_auftraege(_worker_model, auftraege, _worker_output_dir,
+                                _worker_einstellungen, _worker_cache)
+
+
+def erstelle_einstellungen(language: str = None, fenster_sek: float = 0.0,
+                           ueberlappung_sek: float = 2.0, jsonl: bool = False,
+                           stapel: bool = False) -> dict:
+    """Alles, was das Transkript beeinflusst – wird so auch im Manifest abgelegt."""
+    if jsonl and fenster_sek <= 0:
+        # Segmente sollen laufend erscheinen, daher JSONL immer im Streaming-Modus
+        fenster_sek = 30.0
+    return {"optionen": {"language": language, "task": "transcribe"},
+            "fenster_sek": fenster_sek,
+            "ueberlappung_sek": ueberlappung_sek if fenster_sek > 0 else 0.0,
+            "jsonl": jsonl,
+            # Schnitt der Fenster auf Wortebene; ältere Streaming-Transkripte werden neu erstellt
+            "schnitt": "wort" if fenster_sek > 0 else None,
+            # Stapel-Dekodierung ohne Temperatur-Fallback -> eigenes Ergebnis, daher im Manifest
+            "stapel": stapel}
+
+
+def transkribiere_alle(audio_files: list, model_name: str = MODEL_NAME,
+                       workers: int = 1, threads: int = 0, einstellungen: dict = None,
+                       cache: dict = None, hashes: dict = None, output_dir: Path = OUTPUT_DIR,
+                       stapel_groesse: int = 8, bereit_callback=None):
+    """Verarbeitet alle Dateien und liefert die Kennzahlen in Fertigstellungsreihenfolge.
+
+    Mit workers > 1 lädt jeder Prozess das Modell einmal und holt sich den
+    nächsten Auftrag aus der gemeinsamen Warteschlange des Pools. Im Stapel-Modus
+    umfasst ein Auftrag bis zu stapel_groesse Dateien, sonst genau eine.
+    bereit_callback() wird aufgerufen, sobald das Modell bzw. alle Worker geladen sind
+    (der Pool wartet dann darauf, bevor er Aufträge verteilt).
+    """
+    einstellungen = einstellungen or erstelle_einstellungen()
+    paare = [(p, (hashes or {}).get(p.name)) for p in audio_files]
+    n = max(1, stapel_groesse) if einstellungen.get("stapel") else 1
+    auftraege = [paare[i:i + n] for i in range(0, len(paare), n)]
+    if workers <= 1:
+        print("📥 Lade Whisper-Modell...")
+        model = lade_modell(model_name, threads)
+        if bereit_callback is not None:
+            bereit_callback()
+        for auftrag in auftraege:
+            print(f"🎧 Verarbeite: {', '.join(p.name for p, _ in auftrag)}")
+            yield from verarbeite_auftraege(model, auftrag, output_dir, einstellungen, cache)
+        return
+
+    with starte_pool(model_name, workers, threads, einstellungen, cache, output_dir,
+                     warten=bereit_callback is not None) as pool:
+        if bereit_callback is not None:
+            bereit_callback()
+        for ergebnisse in pool.imap_unordered(_worker_verarbeite, auftraege, chunksize=1):
+            yield from ergebnisse
+
+
+def starte_pool(model_name: str, workers: int, threads: int, einstellungen: dict,
+                cache: dict = None, output_dir: Path = OUTPUT_DIR, warten: bool = False):
+    """Startet den Worker-Pool; mit warten=True erst zurück, wenn jeder Worker sein Modell geladen hat."""
+    if threads <= 0:
+        # Überbelegung vermeiden: CPU-Kerne auf die Worker aufteilen
+        threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"📥 Starte {workers} Worker mit je {threads} Torch-Thread(s)...")
+    # "spawn", weil torch nach fork() in Kindprozessen hängen bleiben kann
+    ctx = mp.get_context("spawn")
+    bereit = ctx.Queue() if warten else None
+    pool = ctx.Pool(workers, initializer=_init_worker,
+                    initargs=(model_name, threads, einstellungen, cache, output_dir, bereit))
+    if bereit is not None:
+        for _ in range(workers):
+            bereit.get()
+    return pool
+
+
+def verbuche_ergebnis(r: dict, manifest: dict, sha256: str, model_name: str, einstellungen: dict):
+    """Meldet ein Ergebnis und sichert erfolgreiche Dateien sofort im Manifest."""
+    if r["ok"]:
+        # Nach jeder Datei sichern, damit ein Absturz fertige Dateien nicht verliert
+        manifest[r["datei"]] = {"sha256": sha256, "model": model_name,
+                                "einstellungen": einstellungen, "transkript": r["ausgabe"]}
+        speichere_manifest(manifest)
+        print(f"✅ Transkript gespeichert unter: {r['ausgabe']} ({r['sekunden']:.1f} s)")
+    else:
+        print(f"❌ Fehler bei {r['datei']}: {r['fehler']}")
+
+
+def ist_fertig_geschrieben(file_path: Path, gesehen: dict, ruhe_sek: float) -> bool:
+    """Eine Datei gilt als vollständig, wenn Größe und mtime zwischen zwei Abfragen
+    gleich bleiben, die letzte Änderung ruhe_sek zurückliegt und sie lesbar ist."""
+    try:
+        st = file_path.stat()
+        with open(file_path, "rb"):
+            pass  # unter Windows schlägt das fehl, solange der Schreiber die Datei sperrt
+    except OSError:
+        return False
+    zustand = (st.st_size, st.st_mtime_ns)
+    vorher = gesehen.get(file_path.name)
+    gesehen[file_path.name] = zustand
+    return (vorher == zustand and st.st_size > 0
+            and time.time() - st.st_mtime >= ruhe_sek)
+
+
+def beobachte_ordner(model_name: str, workers: int, threads: int, einstellungen: dict,
+                     poll_sek: float = 2.0, ruhe_sek: float = 3.0, cache: dict = None):
+    """Daemon-Modus: Modell bleibt geladen, neue Dateien in AUDIO_DIR werden laufend
+    transkribiert. SIGINT/SIGTERM beenden nach den gerade laufenden Dateien."""
+    stop = threading.Event()
+
+    def _beenden(signum, frame):
+        if not stop.is_set():
+            print("\n🛑 Beende nach den laufenden Dateien...")
+        stop.set()
+
+    signal.signal(signal.SIGINT, _beenden)
+    signal.signal(signal.SIGTERM, _beenden)
+
+    manifest = lade_manifest()
+    gesehen = {}       # Dateiname -> (Größe, mtime) der letzten Abfrage
+    erledigt = {}      # Dateiname -> (Größe, mtime) bereits geprüfter/fertiger Dateien
+    laufend = {}       # Dateiname -> (AsyncResult, sha256, Zustand)
+
+    pool = model = None
+    if workers > 1:
+        pool = starte_pool(model_name, workers, threads, einstellungen, cache)
+    else:
+        print("📥 Lade Whisper-Modell...")
+        model = lade_modell(model_name, threads)
+    print(f"👀 Beobachte {AUDIO_DIR} (alle {poll_sek:g} s, Strg+C zum Beenden)")
+
+    def _sammle_ergebnisse(warten: bool = False):
+        for name, (async_result, sha256, zustand) in list(laufend.items()):
+            if warten or async_result.ready():
+                verbuche_ergebnis(async_result.get()[0], manifest, sha256, model_name, einstellungen)
+                erledigt[name] = zustand
+                del laufend[name]
+
+    try:
+        while not stop.is_set():
+            if pool is not None:
+                _sammle_ergebnisse()
+            for file_path in finde_audiodateien(AUDIO_DIR):
+                if stop.is_set():
+                    break
+                name = file_path.name
+                if name in laufend or not ist_fertig_geschrieben(file_path, gesehen, ruhe_sek):
+                    continue
+                zustand = gesehen[name]
+                if erledigt.get(name) == zustand:
+                    continue  # seit der letzten Prüfung unverändert, kein erneutes Hashen
+                sha256 = datei_hash(file_path)
+                if ist_aktuell(manifest.get(name), sha256, model_name, einstellungen, OUTPUT_DIR):
+                    erledigt[name] = zustand
+                    continue
+                print(f"🎧 Neue Datei: {name}")
+                if pool is not None:
+                    laufend[name] = (pool.apply_async(_worker_verarbeite, ([(file_path, sha256)],)),
+                                     sha256, zustand)
+                else:
+                    r = verarbeite_auftraege(model, [(file_path, sha256)], OUTPUT_DIR, einstellungen, cache)[0]
+                    verbuche_ergebnis(r, manifest, sha256, model_name, einstellungen)
+                    erledigt[name] = zustand
+            stop.wait(poll_sek)
+    finally:
+        if pool is not None:
+            pool.close()
+            _sammle_ergebnisse(warten=True)
+            pool.join()
+    print("🏁 Beobachtung beendet.")
+
+
+def drucke_zusammenfassung(ergebnisse: list, wall_sek: float):
+    ok = [r for r in ergebnisse if r["ok"]]
+    audio_sek = sum(r["audio_sek"] for r in ok)
+    print("\n📊 Zusammenfassung")
+    print(f"   Dateien:      {len(ok)} ok, {len(ergebnisse) - len(ok)} Fehler")
+    print(f"   Laufzeit:     {wall_sek:.1f} s")
+    print(f"   Audio gesamt: {audio_sek:.1f} s")
+    if wall_sek > 0:
+        print(f"   Durchsatz:    {len(ok) / wall_sek * 60:.1f} Dateien/min, "
+              f"{audio_sek / wall_sek:.2f} s Audio pro s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Automatische Transkription mit lokalem Whisper")
+    parser.add_argument("--model", default=MODEL_NAME, help="Whisper-Modell (base, small, medium, ...)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Anzahl Worker-Prozesse, jeder mit eigenem Modell")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="Torch-Threads pro Worker (0 = automatisch)")
+    parser.add_argument("--language", default=None, help="Sprache vorgeben, z. B. es (Standard: automatisch)")
+    parser.add_argument("--force", action="store_true",
+                        help="Manifest ignorieren und alle Dateien neu transkribieren")
+    parser.add_argument("--chunk-seconds", type=float, default=0.0,
+                        help="Streaming-Modus: Audio in Fenstern dieser Länge dekodieren (0 = aus)")
+    parser.add_argument("--overlap-seconds", type=float, default=2.0,
+                        help="Überlappung zwischen den Fenstern im Streaming-Modus")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="Segmente mit Zeitstempeln laufend nach <stem>.jsonl schreiben")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Kurze Clips (≤ 30 s) in Stapeln dieser Größe gemeinsam dekodieren (1 = aus)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Daemon-Modus: Modell geladen halten und AUDIO_DIR laufend beobachten")
+    parser.add_argument("--poll-seconds", type=float, default=2.0,
+                        help="Abfrageintervall im Daemon-Modus")
+    parser.add_argument("--settle-seconds", type=float, default=3.0,
+                        help="Mindestalter einer Datei, bevor sie als fertig geschrieben gilt")
+    parser.add_argument("--audio-cache", action="store_true",
+                        help="Dekodiertes 16-kHz-Audio in audio_cache/ ablegen und wiederverwenden")
+    parser.add_argument("--cache-max-mb", type=int, default=4096,
+                        help="Maximale Größe des Audio-Caches (älteste Einträge werden verdrängt)")
+    args = parser.parse_args()
+    einstellungen = erstelle_einstellungen(args.language, args.chunk_seconds, args.overlap_seconds,
+                                           args.jsonl, args.batch_size > 1)
+    if einstellungen["fenster_sek"] and einstellungen["fenster_sek"] <= 2 * einstellungen["ueberlappung_sek"]:
+        parser.error("--chunk-seconds muss größer als die doppelte Überlappung sein")
+    cache = {"ordner": CACHE_DIR, "max_bytes": args.cache_max_mb * 1_048_576} if args.audio_cache else None
+
+    print("🔁 Starte automatische Transkription...")
+
+    # 2. Ausgabeordner sicherstellen
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    if args.watch:
+        AUDIO_DIR.mkdir(parents=True, exist_ok=True)
+        beobachte_ordner(args.model, args.workers, args.threads, einstellungen,
+                         args.poll_seconds, args.settle_seconds, cache)
+        return
+
+    # 3. Alle Audiodateien im Ordner suchen
+    audio_files = finde_audiodateien(AUDIO_DIR)
+    if not audio_files:
+        print("⚠️ Keine Audiodateien im Verzeichnis gefunden.")
+        return
+
+    # 4. Nur neue oder geänderte Dateien einplanen (Manifest)
+    manifest = lade_manifest()
+    hashes = {p.name: datei_hash(p) for p in audio_files}
+    offen = [p for p in audio_files
+             if args.force or not ist_aktuell(manifest.get(p.name), hashes[p.name],
+                                              args.model, einstellungen, OUTPUT_DIR)]
+    if len(offen) < len(audio_files):
+        print(f"⏭️ {len(audio_files) - len(offen)} Datei(en) unverändert, übersprungen.")
+    if not offen:
+        print("🏁 Alles aktuell.")
+        return
+
+    # 5. Transkription starten (Modell wird pro Prozess lokal geladen)
+    start = time.perf_counter()
+    ergebnisse = []
+    for r in transkribiere_alle(offen, args.model, args.workers, args.threads, einstellungen,
+                                 cache, hashes, stapel_groesse=args.batch_size):
+        ergebnisse.append(r)
+        verbuche_ergebnis(r, manifest, hashes[r["datei"]], args.model, einstellungen)
+
+    print("🏁 Alle Dateien verarbeitet.")
+    drucke_zusammenfassung(ergebnisse, time.perf_counter() - start)
 
-        print(f"✅ Transkript gespeichert unter: {output_file.name}")
 
-print("🏁 Alle Dateien verarbeitet.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# benchmark_pdf.py
+"""
+Benchmark für pdf_engine.py
+Erzeugt synthetische PDFs (Seiten- und Bildanzahl einstellbar), lässt Komprimieren und
+Zusammenführen mit verschiedenen Einstellungen laufen und schreibt Durchsatz,
+Latenz (p50/p95), Phasenzeiten und Spitzen-RSS als JSON + CSV.
+
+Beispiel:
+    python benchmark_pdf.py --files 20 --pages 10 --images-per-page 2 --workers 1,4 --dpi 0,150
+"""
+import argparse
+import csv
+import json
+import math
+import multiprocessing as mp
+import queue
+import tempfile
+import time
+from pathlib import Path
+
+import pdf_engine
+import fitz  # nach pdf_engine, das PyMuPDF notfalls nachinstalliert
+
+
+def erzeuge_korpus(ziel: Path, anzahl: int, seiten: int, bilder_pro_seite: int,
+                   bild_px: int = 1200, seed: int = 0) -> list:
+    """Schreibt anzahl PDFs mit Text und Rauschbildern. Jede Seite trägt zusätzlich den
+    gleichen "Briefkopf", jede dritte Seite ist um 90° gedreht. Gleicher Seed ergibt den
+    gleichen Korpus."""
+    import random
+    rng = random.Random(seed)
+    ziel.mkdir(parents=True, exist_ok=True)
+
+    def rauschbild(px):
+        # Klein erzeugen und hochskalieren: schnell, aber trotzdem schlecht komprimierbar
+        klein = max(8, px // 8)
+        daten = bytes(rng.randrange(256) for _ in range(klein * klein * 3))
+        return fitz.Pixmap(fitz.Pixmap(fitz.csRGB, klein, klein, daten, False), px, px).tobytes("png")
+
+    briefkopf = rauschbild(200)
+    dateien = []
+    for i in range(anzahl):
+        doc = fitz.open()
+        for s in range(seiten):
+            seite = doc.new_page()
+            seite.insert_image(fitz.Rect(36, 20, 136, 70), stream=briefkopf)
+            for b in range(bilder_pro_seite):
+                y = 90 + b * (700 / max(1, bilder_pro_seite))
+                seite.insert_image(fitz.Rect(72, y, 523, y + 650 / max(1, bilder_pro_seite)),
+                                   stream=rauschbild(bild_px))
+            seite.insert_text((72, 820), f"Datei {i} Seite {s}", fontsize=11)
+            if s % 3 == 2:
+                seite.set_rotation(90)
+        pfad = ziel / f"synth_{i:03d}.pdf"
+        doc.save(str(pfad), deflate=True)
+        doc.close()
+        dateien.append(pfad)
+    return dateien
+
+
+def perzentil(werte: list, p: float) -> float:
+    """Nearest-Rank-Perzentil, ausreichend für kleine Stichproben."""
+    if not werte:
+        return 0.0
+    werte = sorted(werte)
+    return werte[max(0, math.ceil(p / 100 * len(werte)) - 1)]
+
+
+def _messe_konfiguration(operation: str, dateien: list, einstellungen: dict, ausgabe: mp.Queue):
+    """Läuft in einem frischen Prozess, damit RSS-Spitzen nicht zwischen Läufen mitwandern."""
+    ereignisse = []
+    still = lambda t: None
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        if operation == "compress":
+            pdf_engine.verarbeite_pdfs(dateien, Path(tmp), [], still, einstellungen["workers"],
+                                       profil=einstellungen["profil"], ereignis_callback=ereignisse.append)
+        else:
+            pdf_engine.fuehre_zusammen(dateien, Path(tmp), "bench.pdf", still, einstellungen["batch_size"],
+                                       einstellungen["dedup"], ereignis_callback=ereignisse.append)
+        wall = time.perf_counter() - start
+
+    lauf = next((e for e in ereignisse if e["event"] == "done"), {})
+    dateien_ok = [e for e in ereignisse if e["event"] == "file" and e["status"] != "error"]
+    latenzen = [e["seconds"] for e in dateien_ok]
+    seiten = sum(e.get("pages", 0) for e in dateien_ok)
+    bytes_in = sum(e.get("bytes_in", 0) for e in dateien_ok)
+    zeile = {
+        "operation": operation,
+        **{k: v for k, v in einstellungen.items() if k != "profil"},
+        "dpi": (einstellungen.get("profil") or {}).get("dpi", 0),
+        "dateien": len(dateien_ok),
+        "fehler": sum(e["event"] == "file" and e["status"] == "error" for e in ereignisse),
+        "seiten": seiten,
+        "mb_in": round(bytes_in / 1_048_576, 2),
+        "mb_out": round((lauf.get("bytes_out") or 0) / 1_048_576, 2),
+        "wall_sek": round(wall, 3),
+        "dateien_pro_sek": round(len(dateien_ok) / wall, 2) if wall else None,
+        "seiten_pro_sek": round(seiten / wall, 1) if wall else None,
+        "mb_pro_sek": round(bytes_in / 1_048_576 / wall, 2) if wall else None,
+        "latenz_p50_sek": round(perzentil(latenzen, 50), 3),
+        "latenz_p95_sek": round(perzentil(latenzen, 95), 3),
+    }
+    # Phasen summiert über alle Dateien (bei mehreren Workern also CPU-, nicht Wandzeit)
+    zeile.update({k: v for k, v in lauf.items() if k.startswith("t_")})
+    zeile["rss_haupt_mb"] = pdf_engine.spitzen_rss_mb()
+    zeile["rss_worker_max_mb"] = lauf.get("rss_peak_mb") if operation == "merge" else max(
+        (e.get("rss_peak_mb") or 0 for e in dateien_ok), default=None)
+    ausgabe.put(zeile)
+
+
+def schreibe_bericht(zeilen: list, ziel: Path):
+    ziel.parent.mkdir(parents=True, exist_ok=True)
+    with open(ziel.with_suffix(".json"), "w", encoding="utf-8") as f:
+        json.dump(zeilen, f, indent=2)
+    spalten = list(dict.fromkeys(k for z in zeilen for k in z))
+    with open(ziel.with_suffix(".csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=spalten)
+        writer.writeheader()
+        writer.writerows(zeilen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der PDF-Engine")
+    parser.add_argument("--ops", default="compress,merge", help="Kommagetrennt: compress, merge")
+    parser.add_argument("--corpus", type=Path, default=None, help="Ordner mit eigenen PDFs statt des synthetischen Korpus")
+    parser.add_argument("--files", type=int, default=12, help="Anzahl synthetischer PDFs")
+    parser.add_argument("--pages", type=int, default=8, help="Seiten je synthetischer PDF")
+    parser.add_argument("--images-per-page", type=int, default=1, help="Bilder je Seite (zusätzlich zum Briefkopf)")
+    parser.add_argument("--image-px", type=int, default=1200, help="Kantenlänge der Bilder in Pixeln")
+    parser.add_argument("--workers", default="1", help="Kommagetrennt, z. B. 1,2,4 (nur compress)")
+    parser.add_argument("--dpi", default="0", help="Kommagetrennt, Zielauflösung für Bilder, 0 = aus (nur compress)")
+    parser.add_argument("--jpeg-quality", type=int, default=75)
+    parser.add_argument("--batch-sizes", default="0,50", help="Kommagetrennt, 0 = im Speicher (nur merge)")
+    parser.add_argument("--out", type=Path, default=Path("bench_pdf"),
+                        help="Berichtsname ohne Endung; es entstehen .json und .csv")
+    args = parser.parse_args()
+
+    konfigurationen = []
+    for operation in args.ops.split(","):
+        if operation == "compress":
+            for workers in (int(w) for w in args.workers.split(",")):
+                for dpi in (int(d) for d in args.dpi.split(",")):
+                    profil = {"dpi": dpi, "qualitaet": args.jpeg_quality} if dpi > 0 else None
+                    konfigurationen.append((operation, {"workers": workers, "profil": profil}))
+        elif operation == "merge":
+            for stapel in (int(b) for b in args.batch_sizes.split(",")):
+                konfigurationen.append((operation, {"batch_size": stapel, "dedup": stapel > 0}))
+        else:
+            parser.error(f"unbekannte Operation: {operation}")
+
+    with tempfile.TemporaryDirectory() as korpus_tmp:
+        if args.corpus:
+            dateien = sorted(args.corpus.glob("*.pdf"))
+        else:
+            print("🧪 Erzeuge synthetischen Korpus...")
+            dateien = erzeuge_korpus(Path(korpus_tmp), args.files, args.pages,
+                                     args.images_per_page, args.image_px)
+        if not dateien:
+            print("⚠️ Keine PDFs für den Benchmark gefunden.")
+            return
+        print(f"🧪 Korpus: {len(dateien)} Datei(en), "
+              f"{sum(p.stat().st_size for p in dateien) / 1_048_576:.1f} MB")
+
+        ctx = mp.get_context("spawn")
+        zeilen = []
+        for operation, einstellungen in konfigurationen:
+            print(f"\n⏱️ {operation} {einstellungen}...")
+            ergebnis = ctx.Queue()
+            proc = ctx.Process(target=_messe_konfiguration, args=(operation, dateien, einstellungen, ergebnis))
+            proc.start()
+            zeile = None
+            while zeile is None and proc.is_alive():
+                try:
+                    zeile = ergebnis.get(timeout=1)
+                except queue.Empty:
+                    pass
+            if zeile is None and not ergebnis.empty():
+                zeile = ergebnis.get()
+            proc.join()
+            if zeile is None:
+                print(f"❌ Lauf abgebrochen (Exitcode {proc.exitcode})")
+                continue
+            zeilen.append(zeile)
+            print(f"   {zeile['dateien_pro_sek']} Dateien/s  {zeile['seiten_pro_sek']} Seiten/s  "
+                  f"{zeile['mb_pro_sek']} MB/s  p95 {zeile['latenz_p95_sek']} s  "
+                  f"{zeile['mb_in']} → {zeile['mb_out']} MB  RSS {zeile['rss_worker_max_mb']} MB")
+
+    if not zeilen:
+        print("❌ Keine Messwerte.")
+        return
+    schreibe_bericht(zeilen, args.out)
+    print(f"\n📄 Bericht gespeichert: {args.out.with_suffix('.json')}, {args.out.with_suffix('.csv')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,837 @@
+# pdf_engine.py
+"""
+PDF Engine – Drehen/Komprimieren und Zusammenführen ohne GUI
+Wird von PDF_Tool_Devs.py importiert und lässt sich auch direkt aufrufen, z. B. auf
+Servern oder in geplanten Aufgaben. Fortschritt kommt als JSON-Zeilen auf stdout.
+
+Beispiele:
+    python pdf_engine.py compress "scans/**/*.pdf" --workers 4
+    python pdf_engine.py compress eingang/ --recursive --out fertig/
+    python pdf_engine.py merge teil1.pdf teil2.pdf --out gesamt.pdf --batch-size 50
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+def install_requirements():
+    import subprocess
+    for pkg in ["pymupdf"]:
+        subprocess.check_call([sys.executable, "-m", "pip", "install", pkg, "-q"])
+
+try:
+    import fitz
+except ImportError:
+    install_requirements()
+    import fitz
+
+try:
+    import psutil  # optional, liefert unter Windows den Spitzenwert
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CACHE_DATEI = ".pdf_tool_cache.json"
+SPEICHER_OPTIONEN = {"garbage": 4, "deflate": True, "deflate_images": True,
+                     "deflate_fonts": True, "clean": True}
+MIN_ERSPARNIS = 0.01  # darunter gilt eine Datei als "keine Ersparnis"
+BILD_STAPEL = 16  # Bilder, die beim Herunterrechnen gleichzeitig extrahiert werden
+
+
+def spitzen_rss_mb():
+    """Spitzen-RSS dieses Prozesses in MB seit dessen Start (None, falls nicht messbar)."""
+    if psutil is not None:
+        spitze = getattr(psutil.Process().memory_info(), "peak_wset", None)  # nur Windows
+        if spitze is not None:
+            return round(spitze / 1_048_576, 1)
+    if resource is not None:
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS liefert Bytes, Linux Kilobytes
+        return round(kb / 1_048_576 if sys.platform == "darwin" else kb / 1024, 1)
+    return None
+
+
+def aktueller_rss_mb():
+    """Aktueller RSS dieses Prozesses in MB (None ohne psutil außerhalb von Linux)."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 1_048_576
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1_048_576
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+RSS_INTERVALL = 0.05  # Sekunden zwischen zwei RSS-Abfragen
+_rss_messungen = weakref.WeakSet()
+_rss_sperre = threading.Lock()
+_rss_abtaster = None
+
+
+def _rss_nach_fork():
+    # Geforkte Worker erben Messungen und Sperre, aber keinen Abtast-Thread
+    global _rss_messungen, _rss_sperre, _rss_abtaster
+    _rss_messungen = weakref.WeakSet()
+    _rss_sperre = threading.Lock()
+    _rss_abtaster = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_rss_nach_fork)
+
+
+def _taste_rss_ab():
+    while True:
+        time.sleep(RSS_INTERVALL)
+        with _rss_sperre:
+            messungen = list(_rss_messungen)
+            if not messungen:
+                return  # nächste Messung startet den Thread neu
+        jetzt = aktueller_rss_mb()
+        for m in messungen if jetzt is not None else ():
+            m.spitze = max(m.spitze, jetzt)
+
+
+class RssSpitze:
+    """Spitzen-RSS zwischen Erzeugen und beende(), unabhängig vom bisherigen Prozessleben.
+
+    Ein gemeinsamer Hintergrund-Thread tastet alle RSS_INTERVALL Sekunden ab, solange
+    eine Messung läuft; sehr kurze Spitzen dazwischen können fehlen. Nicht beendete
+    Messungen (z. B. nach einer Ausnahme) fallen mit dem Objekt wieder heraus.
+    """
+
+    def __init__(self):
+        global _rss_abtaster
+        self.spitze = aktueller_rss_mb()
+        if self.spitze is None:
+            return
+        with _rss_sperre:
+            _rss_messungen.add(self)
+            if _rss_abtaster is None or not _rss_abtaster.is_alive():
+                _rss_abtaster = threading.Thread(target=_taste_rss_ab, daemon=True)
+                _rss_abtaster.start()
+
+    def beende(self):
+        """Beendet die Messung und gibt die Spitze in MB zurück (None, falls nicht messbar)."""
+        if self.spitze is None:
+            return None
+        with _rss_sperre:
+            _rss_messungen.discard(self)
+        self.spitze = max(self.spitze, aktueller_rss_mb() or 0.0)
+        return round(self.spitze, 1)
+
+
+def schreibe_metriken(zeilen: list, lauf: dict, ziel: Path):
+    """Metriken eines Laufs als <ziel>.json (Zusammenfassung + Dateien) und <ziel>.csv
+    (eine Zeile je Datei) ablegen."""
+    ziel.parent.mkdir(parents=True, exist_ok=True)
+    with open(ziel.with_suffix(".json"), "w", encoding="utf-8") as f:
+        json.dump({"lauf": lauf, "dateien": zeilen}, f, ensure_ascii=False, indent=2)
+    spalten = list(dict.fromkeys(k for z in zeilen for k in z))
+    with open(ziel.with_suffix(".csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=spalten)
+        writer.writeheader()
+        writer.writerows(zeilen)
+
+
+def metriken_pfad(ordner: Path, art: str) -> Path:
+    """Zeitgestempelter Ablageort je Lauf, z. B. komprimiert/.metriken/compress_20250101-120000."""
+    return ordner / ".metriken" / f"{art}_{time.strftime('%Y%m%d-%H%M%S')}"
+
+
+def _datei_hash(pfad: Path) -> str:
+    h = hashlib.sha256()
+    with open(pfad, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _lade_cache(ausgabe_ordner: Path) -> dict:
+    try:
+        with open(ausgabe_ordner / CACHE_DATEI, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _speichere_cache(ausgabe_ordner: Path, cache: dict):
+    # Erst temporär schreiben, damit ein Abbruch keine halbe JSON hinterlässt
+    ziel = ausgabe_ordner / CACHE_DATEI
+    tmp = ziel.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=1)
+    os.replace(tmp, ziel)
+
+
+def _cache_optionen(ausnahme: bool, durchreichen: bool, profil: dict = None) -> dict:
+    return {**SPEICHER_OPTIONEN, "ausnahme": ausnahme, "durchreichen": durchreichen, "bilder": profil}
+
+
+def _pruefe_cache(pfad: Path, ausgabe_ordner: Path, eintrag: dict, optionen: dict):
+    """Gibt (unverändert, sha256) zurück. Stimmen Größe und mtime mit dem Cache überein,
+    wird der gespeicherte Hash übernommen, sonst die Datei neu gehasht."""
+    stat = pfad.stat()
+    if eintrag and eintrag["groesse"] == stat.st_size and eintrag["mtime_ns"] == stat.st_mtime_ns:
+        sha256 = eintrag["sha256"]
+    else:
+        sha256 = _datei_hash(pfad)
+    if not eintrag or eintrag["sha256"] != sha256 or eintrag["optionen"] != optionen:
+        return False, sha256
+    ausgabe = ausgabe_ordner / pfad.name
+    return ausgabe.exists() and ausgabe.stat().st_size == eintrag["ausgabe_groesse"], sha256
+
+
+def _verkleinere_bild(daten: bytes, breite: int, hoehe: int, qualitaet: int):
+    """Dekodiert ein Bild, skaliert es auf breite x hoehe und kodiert es als JPEG.
+    Reine Pixelarbeit ohne Dokumentbezug, daher auch in Worker-Prozessen lauffähig."""
+    pix = fitz.Pixmap(daten)
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    if pix.colorspace is None or pix.colorspace.n not in (1, 3):
+        pix = fitz.Pixmap(fitz.csRGB, pix)  # CMYK, Indexed ... -> RGB
+    return fitz.Pixmap(pix, breite, hoehe).tobytes("jpeg", jpg_quality=qualitaet)
+
+
+def _ist_maske(doc, xref: int) -> bool:
+    """True für Schablonenmasken (/ImageMask true) und Bilder mit eigener /Mask."""
+    return (doc.xref_get_key(xref, "ImageMask")[1] == "true"
+            or doc.xref_get_key(xref, "Mask")[0] != "null")
+
+
+def _bild_ziele(doc, ziel_dpi: int) -> dict:
+    """xref -> (Seite, Zielbreite, Zielhöhe) für alle Bilder, die über ziel_dpi liegen.
+    Wird ein Bild mehrfach platziert, zählt die größte Darstellung."""
+    ziele = {}
+    for seite in doc:
+        for info in seite.get_image_info(xrefs=True):
+            xref = info["xref"]
+            if xref <= 0:
+                continue  # Inline-Bild
+            if info["bpc"] == 1 or info["colorspace"] == 0 or _ist_maske(doc, xref):
+                continue  # Schablonen/Masken: als JPEG würden Umriss oder Transparenz verloren gehen
+            a, b, c, d = info["transform"][:4]
+            faktor = max(math.hypot(a, b) / 72 * ziel_dpi / info["width"],
+                         math.hypot(c, d) / 72 * ziel_dpi / info["height"])
+            if xref not in ziele or faktor > ziele[xref][0]:
+                ziele[xref] = (faktor, seite.number, info["width"], info["height"])
+    # Erst ab 10 % Überschuss verkleinern, sonst lohnt das Neukodieren nicht
+    return {xref: (nr, max(1, round(b * f)), max(1, round(h * f)))
+            for xref, (f, nr, b, h) in ziele.items() if f < 0.9}
+
+
+def _verkleinere_bilder(doc, profil: dict, pool=None) -> int:
+    """Rechnet Bilder oberhalb profil["dpi"] herunter und ersetzt sie durch JPEGs mit
+    profil["qualitaet"], sofern das Ergebnis kleiner ist. pool: optionaler Executor für
+    die Pixelarbeit. Gibt die Anzahl ersetzter Bilder zurück.
+
+    Bilder werden in Stapeln zu BILD_STAPEL extrahiert, damit nie alle Bilddaten eines
+    Dokuments gleichzeitig im Speicher (oder in der Pool-Warteschlange) liegen."""
+    ziele = list(_bild_ziele(doc, profil["dpi"]).items())
+    ersetzt = 0
+    for i in range(0, len(ziele), BILD_STAPEL):
+        auftraege = []
+        for xref, (nr, breite, hoehe) in ziele[i:i + BILD_STAPEL]:
+            bild = doc.extract_image(xref)
+            if not bild or bild["smask"]:
+                continue  # Transparenz würde JPEG verlieren
+            auftraege.append((xref, nr, len(doc.xref_stream_raw(xref)),
+                              (bild["image"], breite, hoehe, profil["qualitaet"])))
+        if not auftraege:
+            continue
+        if pool is not None:
+            ergebnisse = pool.map(_verkleinere_bild, *zip(*(a[3] for a in auftraege)))
+        else:
+            ergebnisse = (_verkleinere_bild(*a[3]) for a in auftraege)
+
+        for (xref, nr, alt_groesse, _), jpeg in zip(auftraege, ergebnisse):
+            if len(jpeg) < alt_groesse:
+                doc[nr].replace_image(xref, stream=jpeg)
+                ersetzt += 1
+    return ersetzt
+
+
+def _verarbeite_datei(pfad: Path, ausgabe_ordner: Path, ausnahme: bool, durchreichen: bool = False,
+                      profil: dict = None, bild_pool=None) -> dict:
+    """Dreht und komprimiert eine PDF. Läuft auch in Worker-Prozessen, daher modulweit.
+
+    Gibt ein Ergebnis-Dict zurück (status: ok, no_gain, copied oder error). Bringt das
+    Neuschreiben nichts und musste nichts gedreht werden, wird mit durchreichen=True das
+    Original unverändert kopiert. profil ({"dpi", "qualitaet"}) verkleinert zusätzlich
+    Bilder, optional verteilt auf bild_pool.
+    """
+    start = time.perf_counter()
+    rss = RssSpitze()
+    ergebnis = {"file": pfad.name, "status": "error", "info": "", "pages": 0, "rotated": 0,
+                "images": 0, "bytes_in": 0, "bytes_out": None,
+                "t_open": 0.0, "t_pages": 0.0, "t_images": 0.0, "t_save": 0.0}
+
+    def phase(name, seit):
+        jetzt = time.perf_counter()
+        ergebnis[name] = round(jetzt - seit, 4)
+        return jetzt
+
+    try:
+        ausgabe = ausgabe_ordner / pfad.name
+        ergebnis["bytes_in"] = pfad.stat().st_size
+        t = start
+        doc = fitz.open(str(pfad))
+        ergebnis["pages"] = len(doc)
+        t = phase("t_open", t)
+
+        gedreht = 0
+        for nr in range(len(doc)):
+            seite = doc[nr]
+            if not ausnahme and seite.rotation != 0:
+                # Rotation direkt auf 0° zurücksetzen (90, 180, 270 → 0)
+                seite.set_rotation(0)
+                gedreht += 1
+        ergebnis["rotated"] = gedreht
+        t = phase("t_pages", t)
+
+        info = f"{gedreht} Seite(n) auf 0° korrigiert" if gedreht > 0 else "keine Rotation nötig"
+        if ausnahme:
+            info = "übersprungen (Ausnahme)"
+        if profil:
+            ergebnis["images"] = _verkleinere_bilder(doc, profil, bild_pool)
+            if ergebnis["images"]:
+                info += f", {ergebnis['images']} Bild(er) auf {profil['dpi']} dpi"
+        ergebnis["info"] = info
+        t = phase("t_images", t)
+
+        doc.save(str(ausgabe), **SPEICHER_OPTIONEN)
+        doc.close()
+        phase("t_save", t)
+
+        ergebnis["bytes_out"] = ausgabe.stat().st_size
+        ergebnis["status"] = "ok"
+        if gedreht == 0 and not ergebnis["images"] and ergebnis["bytes_out"] > ergebnis["bytes_in"] * (1 - MIN_ERSPARNIS):
+            ergebnis["status"] = "no_gain"
+            if durchreichen:
+                shutil.copyfile(pfad, ausgabe)
+                ergebnis["bytes_out"] = ergebnis["bytes_in"]
+                ergebnis["status"] = "copied"
+    except Exception as e:
+        ergebnis["error"] = str(e)
+    ergebnis["seconds"] = round(time.perf_counter() - start, 3)
+    # Spitze des ausführenden Prozesses während dieser Datei (bei Worker-Prozessen: dieses Workers)
+    ergebnis["rss_peak_mb"] = rss.beende()
+    return ergebnis
+
+
+def _meldung(ergebnis: dict) -> str:
+    """Log-Zeile für die GUI aus einem Ergebnis-Dict."""
+    info, nachher = ergebnis["info"], ergebnis["bytes_out"]
+    if ergebnis["status"] == "error":
+        return f" ❌ Fehler: {ergebnis['error']}\n"
+    if ergebnis["status"] == "copied":
+        return f" ⚪ {info} | keine Ersparnis, Original kopiert\n"
+    if ergebnis["status"] == "no_gain":
+        return f" ⚪ {info} | keine Ersparnis ({nachher/1_048_576:.1f} MB)\n"
+    ersparnis = (1 - nachher / ergebnis["bytes_in"]) * 100
+    return f" ✅ {info} | {nachher/1_048_576:.1f} MB ({ersparnis:.0f}% kleiner, {ergebnis['seconds']:.1f} s)\n"
+
+
+def _beende_worker(pool: ProcessPoolExecutor):
+    """Stoppt die Worker-Prozesse sofort (shutdown allein wartet laufende Aufrufe ab)."""
+    if hasattr(pool, "terminate_workers"):  # ab Python 3.14
+        pool.terminate_workers()
+        return
+    for prozess in list((pool._processes or {}).values()):
+        prozess.terminate()
+    pool.shutdown(wait=True, cancel_futures=True)
+
+
+def verarbeite_pdfs(dateien: list, ausgabe_ordner: Path, ausnahmen: list, log_callback,
+                    worker: int = 1, abbruch: threading.Event = None, durchreichen: bool = False,
+                    ereignis_callback=None, profil: dict = None, metriken: Path = None) -> list:
+    """worker > 1 verteilt die Dateien auf Prozesse (save mit garbage=4 hält den GIL).
+    Ergebnisse erscheinen in Fertigstellungsreihenfolge. abbruch wird alle 200 ms geprüft;
+    im Prozessmodus werden laufende Dateien dann abgebrochen und ihre Teilausgaben gelöscht.
+
+    Im Ausgabeordner liegt ein Cache (Eingabe-Hash + Speicheroptionen je Datei); Dateien,
+    deren Ergebnis schon aktuell ist, werden übersprungen. ereignis_callback erhält je
+    Datei und am Ende ein Dict (siehe main: JSON-Zeilen). Gibt die Ergebnis-Dicts zurück.
+
+    profil ({"dpi": 150, "qualitaet": 75}) aktiviert das Verkleinern von Bildern. Bei nur
+    einem Datei-Prozess wird dann stattdessen die Bildarbeit auf Prozesse verteilt.
+    metriken: Pfad ohne Endung; dort landen Phasenzeiten und Spitzen-RSS als JSON + CSV.
+    rss_peak_mb gilt nur für diesen Lauf (siehe RssSpitze), nicht für das ganze Prozessleben.
+    """
+    ereignis = ereignis_callback or (lambda e: None)
+    start = time.perf_counter()
+    if not dateien:
+        log_callback("❌ Keine PDFs ausgewählt!\n")
+        return []
+
+    rss = RssSpitze()
+    ausgabe_ordner.mkdir(parents=True, exist_ok=True)
+    cache = _lade_cache(ausgabe_ordner)
+    auftraege = []
+    ergebnisse = []
+    uebersprungen = 0
+    for p in dateien:
+        pfad = Path(p)
+        ausnahme = pfad.name in ausnahmen
+        optionen = _cache_optionen(ausnahme, durchreichen, profil)
+        try:
+            aktuell, sha256 = _pruefe_cache(pfad, ausgabe_ordner, cache.get(pfad.name), optionen)
+        except OSError as e:
+            log_callback(f"📄 {pfad.name}: ❌ Fehler: {e}\n")
+            ergebnisse.append({"file": pfad.name, "status": "error", "error": str(e)})
+            ereignis({"event": "file", **ergebnisse[-1]})
+            continue
+        if aktuell:
+            uebersprungen += 1
+            ereignis({"event": "file", "file": pfad.name, "status": "skipped",
+                      "bytes_out": cache[pfad.name]["ausgabe_groesse"]})
+        else:
+            auftraege.append((pfad, ausnahme, optionen, sha256))
+    if uebersprungen:
+        log_callback(f"⏭️ {uebersprungen} PDF(s) unverändert, übersprungen\n")
+
+    ohne_ersparnis = []
+
+    def verbuche(auftrag, ergebnis):
+        pfad, _, optionen, sha256 = auftrag
+        ergebnisse.append(ergebnis)
+        ereignis({"event": "file", **ergebnis})
+        if ergebnis["status"] in ("no_gain", "copied"):
+            ohne_ersparnis.append(pfad.name)
+        if ergebnis["status"] == "error":
+            cache.pop(pfad.name, None)
+            return
+        stat = pfad.stat()
+        cache[pfad.name] = {"sha256": sha256, "groesse": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                            "optionen": optionen, "ausgabe_groesse": ergebnis["bytes_out"]}
+        _speichere_cache(ausgabe_ordner, cache)
+
+    def abschluss(abgebrochen=False):
+        lauf = {"event": "done", "files": len(dateien), "processed": len(ergebnisse),
+                "skipped": uebersprungen, "cancelled": abgebrochen,
+                "errors": sum(e["status"] == "error" for e in ergebnisse),
+                "bytes_in": sum(e.get("bytes_in", 0) for e in ergebnisse),
+                "bytes_out": sum(e.get("bytes_out") or 0 for e in ergebnisse),
+                "pages": sum(e.get("pages", 0) for e in ergebnisse),
+                "seconds": round(time.perf_counter() - start, 3),
+                "workers": worker, "profil": profil, "rss_peak_mb": rss.beende()}
+        for phase in ("t_open", "t_pages", "t_images", "t_save"):
+            lauf[phase] = round(sum(e.get(phase, 0) for e in ergebnisse), 3)
+        if metriken is not None and ergebnisse:
+            schreibe_metriken(ergebnisse, lauf, metriken)
+        ereignis(lauf)
+        return ergebnisse
+
+    worker = max(1, min(worker, len(auftraege)))
+    if not auftraege:
+        log_callback(f"\n📁 Nichts zu tun. Dateien in: {ausgabe_ordner}\n")
+        return abschluss()
+
+    log_callback(f"✅ {len(auftraege)} PDF(s) wird verarbeitet...\n")
+
+    if worker == 1:
+        bild_pool = None
+        if profil and (os.cpu_count() or 1) > 1:
+            bild_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        try:
+            for auftrag in auftraege:
+                if abbruch is not None and abbruch.is_set():
+                    log_callback("\n⛔ Abgebrochen.\n")
+                    return abschluss(True)
+                pfad, ausnahme = auftrag[:2]
+                log_callback(f"⏳ {pfad.name}...")
+                ergebnis = _verarbeite_datei(pfad, ausgabe_ordner, ausnahme, durchreichen, profil, bild_pool)
+                verbuche(auftrag, ergebnis)
+                log_callback(_meldung(ergebnis))
+        finally:
+            if bild_pool is not None:
+                bild_pool.shutdown(cancel_futures=True)
+    else:
+        log_callback(f"⚙️ {worker} Prozesse parallel\n")
+        pool = ProcessPoolExecutor(max_workers=worker)
+        wartend = iter(auftraege)
+        laufend = {}
+
+        def nachlegen():
+            # Nie mehr als worker Dateien im Executor, damit ein Abbruch nichts Wartendes übrig lässt
+            while len(laufend) < worker:
+                a = next(wartend, None)
+                if a is None:
+                    break
+                laufend[pool.submit(_verarbeite_datei, a[0], ausgabe_ordner, a[1], durchreichen, profil)] = a
+
+        try:
+            nachlegen()
+            while laufend:
+                fertig, _ = wait(laufend, timeout=0.2, return_when=FIRST_COMPLETED)
+                if abbruch is not None and abbruch.is_set():
+                    _beende_worker(pool)
+                    for a in laufend.values():
+                        # Halb geschriebene Ausgaben entfernen, beim nächsten Lauf neu erzeugen
+                        (ausgabe_ordner / a[0].name).unlink(missing_ok=True)
+                    namen = ", ".join(a[0].name for a in laufend.values())
+                    log_callback(f"\n⛔ Abgebrochen. Laufende Dateien gestoppt: {namen}\n")
+                    return abschluss(True)
+                for future in fertig:
+                    auftrag = laufend.pop(future)
+                    ergebnis = future.result()
+                    verbuche(auftrag, ergebnis)
+                    log_callback(f"📄 {auftrag[0].name}:{_meldung(ergebnis)}")
+                nachlegen()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    if ohne_ersparnis:
+        aktion = "Original kopiert" if durchreichen else "trotzdem neu geschrieben"
+        log_callback(f"\n⚪ Keine Ersparnis bei {len(ohne_ersparnis)} Datei(en) ({aktion}): "
+                     f"{', '.join(ohne_ersparnis)}\n")
+    log_callback(f"\n📁 Fertig! Dateien in: {ausgabe_ordner}\n")
+    return abschluss()
+
+
+_VERWEIS = re.compile(r"\b(\d+) 0 R\b")
+# Schlüssel, die nur die Kodierung beschreiben, nicht den Inhalt
+_KODIER_SCHLUESSEL = {"Length", "Filter", "DecodeParms", "DL"}
+_SCHRIFT_TYPEN = {"/Font", "/FontDescriptor"}
+
+
+def _ressourcen_xrefs(doc, erste_neue_xref: int) -> list:
+    """Neu eingefügte Bilder und Schriften samt allem, worauf sie verweisen (Farbräume,
+    ICC-Profile, SMasks, Font-Dateien ...). Anmerkungen und Seitenobjekte gehören nie dazu,
+    damit Seiten sich keine bearbeitbaren Objekte teilen."""
+    ende = doc.xref_length()
+    offen = [x for x in range(erste_neue_xref, ende)
+             if doc.xref_get_key(x, "Subtype")[1] == "/Image"
+             or doc.xref_get_key(x, "Type")[1] in _SCHRIFT_TYPEN]
+    gefunden = set()
+    while offen:
+        xref = offen.pop()
+        if xref in gefunden or not erste_neue_xref <= xref < ende:
+            continue
+        gefunden.add(xref)
+        try:
+            objekt = doc.xref_object(xref, compressed=True)
+        except RuntimeError:
+            continue
+        offen.extend(int(m[1]) for m in _VERWEIS.finditer(objekt))
+    return sorted(gefunden)
+
+
+def _dedupliziere_objekte(doc, erste_neue_xref: int, bekannte: dict) -> int:
+    """Ersetzt neu eingefügte Bilder und Schriften samt ihren Abhängigkeiten (ICC-Profile,
+    Farbräume, Font-Dateien ...), die inhaltlich einem bereits bekannten Objekt gleichen,
+    durch einen Verweis auf dieses.
+
+    bekannte: Digest -> xref, bleibt über alle Stapel erhalten. Bei Streams zählt der
+    dekodierte Inhalt plus das Dictionary ohne Kodierungsangaben. Alle anderen Objekte
+    (Seiten, Anmerkungen, Links ...) bleiben je Seite eigenständig. Gibt die Anzahl
+    ersetzter Objekte zurück.
+    """
+    ersetzt = {}
+    inhalt = {}
+    registriert = {}  # xref -> in diesem Aufruf unter ihm eingetragene Digests
+    kandidaten = _ressourcen_xrefs(doc, erste_neue_xref)
+
+    def ziel(xref):
+        while xref in ersetzt:  # Ketten auflösen, falls das Ziel später selbst ersetzt wurde
+            xref = ersetzt[xref]
+        return xref
+
+    def umschreiben(text):
+        return _VERWEIS.sub(lambda m: f"{ziel(int(m[1]))} 0 R", text)
+
+    def digest(xref):
+        if not doc.xref_is_stream(xref):
+            return hashlib.sha1(umschreiben(doc.xref_object(xref, compressed=True)).encode("utf-8")).digest()
+        if xref not in inhalt:
+            inhalt[xref] = hashlib.sha1(doc.xref_stream(xref) or b"").digest()
+        teile = [f"/{k} {umschreiben(doc.xref_get_key(xref, k)[1])}"
+                 for k in sorted(doc.xref_get_keys(xref)) if k not in _KODIER_SCHLUESSEL]
+        return hashlib.sha1("".join(teile).encode("utf-8") + inhalt[xref]).digest()
+
+    # Wiederholen, bis nichts mehr hinzukommt: ein Bild ist erst gleich, wenn auch
+    # sein Farbraum und dessen ICC-Profil bereits ersetzt sind
+    geaendert = True
+    while geaendert:
+        geaendert = False
+        for xref in kandidaten:
+            if xref in ersetzt:
+                continue
+            try:
+                d = digest(xref)
+            except RuntimeError:
+                continue  # leeres/defektes Objekt
+            kanon = bekannte.setdefault(d, xref)
+            if kanon == xref:
+                registriert.setdefault(xref, set()).add(d)
+            else:
+                ersetzt[xref] = kanon
+                # Frühere (vorläufige) Digests dieses Objekts dürfen nicht auf ein
+                # Objekt zeigen, das gleich auf null gesetzt wird
+                for alt in registriert.pop(xref, ()):
+                    del bekannte[alt]
+                geaendert = True
+
+    if ersetzt:
+        for xref in range(erste_neue_xref, doc.xref_length()):
+            if xref in ersetzt:
+                continue
+            try:
+                alt = doc.xref_object(xref, compressed=True)
+            except RuntimeError:
+                continue
+            neu = umschreiben(alt)
+            if neu != alt:
+                doc.update_object(xref, neu)
+        for xref in ersetzt:
+            doc.update_object(xref, "null")
+    return len(ersetzt)
+
+
+def _haenge_an(neues_doc, pfad: Path, log_callback, ereignis):
+    """Fügt eine Eingabe an neues_doc an und meldet sie per Log und Ereignis."""
+    start = time.perf_counter()
+    if not pfad.exists():
+        log_callback(f"   ❌ Nicht gefunden: {pfad.name}\n")
+        ereignis({"event": "file", "file": pfad.name, "status": "error", "error": "not found"})
+        return
+    doc = fitz.open(str(pfad))
+    seiten = len(doc)
+    geoeffnet = time.perf_counter()
+    neues_doc.insert_pdf(doc)
+    doc.close()
+    ende = time.perf_counter()
+    log_callback(f"   ✅ {pfad.name}\n")
+    ereignis({"event": "file", "file": pfad.name, "status": "ok", "pages": seiten,
+              "bytes_in": pfad.stat().st_size, "seconds": round(ende - start, 3),
+              "t_open": round(geoeffnet - start, 4), "t_insert": round(ende - geoeffnet, 4)})
+
+
+def _fuehre_zusammen_gestaffelt(dateien: list, ausgabe: Path, log_callback, ereignis,
+                                stapel_groesse: int, duplikate_entfernen: bool, zeiten: dict) -> int:
+    """Hängt die Eingaben stapelweise per inkrementellem Speichern an die Ausgabe an.
+
+    Im Speicher liegt immer nur ein Stapel; es gibt keinen abschließenden
+    garbage=4-Durchlauf über das Gesamtdokument. Gibt die Zahl ersetzter Objekte zurück,
+    die Dauer von Deduplizierung und Speichern wird in zeiten aufsummiert.
+    """
+    # Erst in eine Teildatei schreiben, falls die Ausgabe selbst unter den Eingaben ist
+    teil = ausgabe.with_name(ausgabe.stem + ".teil.pdf")
+    bekannte = {}
+    ersetzt = 0
+    erster = True
+    try:
+        for i in range(0, len(dateien), stapel_groesse):
+            neues_doc = fitz.open() if erster else fitz.open(str(teil))
+            erste_neue_xref = neues_doc.xref_length()
+            seiten_vorher = len(neues_doc)
+            for pfad in dateien[i:i + stapel_groesse]:
+                _haenge_an(neues_doc, Path(pfad), log_callback, ereignis)
+            if len(neues_doc) > seiten_vorher:
+                t = time.perf_counter()
+                if duplikate_entfernen:
+                    ersetzt += _dedupliziere_objekte(neues_doc, erste_neue_xref, bekannte)
+                zeiten["t_dedup"] += time.perf_counter() - t
+                t = time.perf_counter()
+                if erster:
+                    # garbage=0: xref-Nummern bleiben stabil, bekannte gilt weiter
+                    neues_doc.save(str(teil), garbage=0, deflate=True)
+                    erster = False
+                else:
+                    neues_doc.saveIncr()
+                zeiten["t_save"] += time.perf_counter() - t
+            neues_doc.close()
+    except Exception:
+        teil.unlink(missing_ok=True)
+        raise
+
+    if erster:
+        log_callback("\n❌ Keine Seiten zum Zusammenführen.\n")
+        return 0
+    os.replace(teil, ausgabe)
+    if duplikate_entfernen:
+        log_callback(f"\n♻️ {ersetzt} doppelte Bilder/Schriften nur einmal gespeichert\n")
+    return ersetzt
+
+
+def fuehre_zusammen(dateien: list, ordner: Path, ausgabename: str, log_callback,
+                    stapel_groesse: int = 0, duplikate_entfernen: bool = False,
+                    ereignis_callback=None, metriken: Path = None):
+    """stapel_groesse > 0 aktiviert den speicherschonenden Modus (siehe
+    _fuehre_zusammen_gestaffelt), sonst wird wie bisher komplett im Speicher gearbeitet.
+    duplikate_entfernen gilt nur für den Stapelmodus; im Speicher erledigt das garbage=4.
+    metriken: wie bei verarbeite_pdfs."""
+    zeilen = []
+
+    def ereignis(e):
+        if e["event"] == "file":
+            zeilen.append({k: v for k, v in e.items() if k != "event"})
+        if ereignis_callback:
+            ereignis_callback(e)
+
+    start = time.perf_counter()
+    zeiten = {"t_dedup": 0.0, "t_save": 0.0}
+    if not dateien:
+        log_callback("❌ Keine PDFs ausgewählt!\n")
+        return
+
+    rss = RssSpitze()
+    log_callback(f"Füge {len(dateien)} PDFs zusammen...\n")
+    ausgabe = ordner / ausgabename
+    ersetzt = 0
+    if stapel_groesse > 0:
+        ersetzt = _fuehre_zusammen_gestaffelt(dateien, ausgabe, log_callback, ereignis,
+                                              stapel_groesse, duplikate_entfernen, zeiten)
+        if not ausgabe.exists():
+            rss.beende()
+            return
+    else:
+        neues_doc = fitz.open()
+        for pfad in dateien:
+            _haenge_an(neues_doc, Path(pfad), log_callback, ereignis)
+        t = time.perf_counter()
+        neues_doc.save(str(ausgabe), garbage=4, deflate=True, clean=True)
+        neues_doc.close()
+        zeiten["t_save"] = time.perf_counter() - t
+
+    log_callback(f"\n📄 Gespeichert als: {ausgabe.name}  ({ausgabe.stat().st_size/1_048_576:.1f} MB)\n")
+    with fitz.open(str(ausgabe)) as doc:
+        seiten = len(doc)
+    lauf = {"event": "done", "output": str(ausgabe), "files": len(dateien), "pages": seiten,
+            "bytes_in": sum(z.get("bytes_in", 0) for z in zeilen),
+            "bytes_out": ausgabe.stat().st_size, "deduplicated": ersetzt,
+            "seconds": round(time.perf_counter() - start, 3), "batch_size": stapel_groesse,
+            "t_open": round(sum(z.get("t_open", 0) for z in zeilen), 3),
+            "t_insert": round(sum(z.get("t_insert", 0) for z in zeilen), 3),
+            "t_dedup": round(zeiten["t_dedup"], 3), "t_save": round(zeiten["t_save"], 3),
+            "rss_peak_mb": rss.beende()}
+    if metriken is not None:
+        schreibe_metriken(zeilen, lauf, metriken)
+    ereignis(lauf)
+
+
+def eingabe_wurzel(eingaben: list) -> Path:
+    """Gemeinsamer Ordner aller Eingaben: Ordner selbst, bei Mustern der Teil vor dem
+    ersten Platzhalter, bei Dateien deren Ordner."""
+    wurzeln = []
+    for eingabe in eingaben:
+        pfad = Path(eingabe)
+        if glob.has_magic(eingabe):
+            teile = []
+            for teil in pfad.parts:
+                if glob.has_magic(teil):
+                    break
+                teile.append(teil)
+            pfad = Path(*teile) if teile else Path(".")
+        elif not pfad.is_dir():
+            pfad = pfad.parent
+        wurzeln.append(pfad.resolve())
+    return Path(os.path.commonpath(wurzeln))
+
+
+def sammle_pdfs(eingaben: list, rekursiv: bool = False, ausschliessen: Path = None) -> list:
+    """Ordner, Glob-Muster (auch "**") oder einzelne Dateien zu einer PDF-Liste auflösen.
+    Muster werden selbst expandiert, weil die Windows-Shell das nicht tut.
+    ausschliessen: Ausgabeordner oder -datei, damit ein erneuter Lauf seine eigenen
+    Ergebnisse nicht wieder als Eingabe einsammelt."""
+    dateien = []
+    for eingabe in eingaben:
+        pfad = Path(eingabe)
+        if pfad.is_dir():
+            treffer = sorted(pfad.rglob("*.pdf") if rekursiv else pfad.glob("*.pdf"))
+        elif glob.has_magic(eingabe):
+            treffer = sorted(Path(t) for t in glob.glob(eingabe, recursive=True) if t.lower().endswith(".pdf"))
+        else:
+            treffer = [pfad]
+        dateien.extend(treffer)
+    # Doppelte Angaben nur einmal, Reihenfolge bleibt erhalten
+    dateien = dict.fromkeys(p.resolve() for p in dateien)
+    if ausschliessen is not None:
+        ausschliessen = ausschliessen.resolve()
+        return [p for p in dateien if p != ausschliessen and ausschliessen not in p.parents]
+    return list(dateien)
+
+
+def main():
+    # Gemeinsame Optionen hängen an jedem Unterbefehl, damit sie hinter "compress"/"merge" stehen dürfen
+    gemeinsam = argparse.ArgumentParser(add_help=False)
+    gemeinsam.add_argument("--quiet", action="store_true", help="Keine Textmeldungen auf stderr, nur JSON-Zeilen")
+    gemeinsam.add_argument("--metrics", type=Path, default=None,
+                           help="Metriken (Phasenzeiten, Spitzen-RSS) als <Pfad>.json und <Pfad>.csv schreiben")
+
+    parser = argparse.ArgumentParser(description="PDFs drehen/komprimieren oder zusammenführen (ohne GUI)")
+    befehle = parser.add_subparsers(dest="befehl", required=True)
+
+    komp = befehle.add_parser("compress", parents=[gemeinsam], help="Seiten auf 0° drehen und komprimieren")
+    komp.add_argument("inputs", nargs="+", help="PDF-Dateien, Ordner oder Glob-Muster")
+    komp.add_argument("--recursive", action="store_true", help="Ordner inklusive Unterordnern durchsuchen")
+    komp.add_argument("--out", type=Path, default=None,
+                      help="Ausgabeordner (Standard: 'komprimiert' im gemeinsamen Eingabeordner)")
+    komp.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Anzahl Prozesse")
+    komp.add_argument("--exclude", action="append", default=[], help="Dateiname, der nicht gedreht wird (mehrfach möglich)")
+    komp.add_argument("--copy-through", action="store_true",
+                      help="Dateien ohne Ersparnis unverändert kopieren")
+    komp.add_argument("--downsample-dpi", type=int, default=0,
+                      help="Bilder oberhalb dieser Auflösung verkleinern und als JPEG speichern (0 = aus)")
+    komp.add_argument("--jpeg-quality", type=int, default=75, help="JPEG-Qualität für verkleinerte Bilder (1-100)")
+
+    zus = befehle.add_parser("merge", parents=[gemeinsam], help="PDFs in der angegebenen Reihenfolge zusammenführen")
+    zus.add_argument("inputs", nargs="+", help="PDF-Dateien, Ordner oder Glob-Muster")
+    zus.add_argument("--recursive", action="store_true", help="Ordner inklusive Unterordnern durchsuchen")
+    zus.add_argument("--out", type=Path, required=True, help="Ausgabedatei")
+    zus.add_argument("--batch-size", type=int, default=0,
+                     help="Speicherschonend in Stapeln dieser Größe anhängen (0 = alles im Speicher)")
+    zus.add_argument("--dedup", action="store_true", help="Im Stapelmodus gleiche Bilder/Schriften nur einmal speichern")
+    args = parser.parse_args()
+
+    if args.befehl == "compress":
+        ausgabe = args.out or eingabe_wurzel(args.inputs) / "komprimiert"
+    else:
+        ausgabe = args.out
+    dateien = sammle_pdfs(args.inputs, args.recursive, ausschliessen=ausgabe)
+    if not dateien:
+        parser.error("keine PDFs gefunden")
+
+    def log(text):
+        if not args.quiet:
+            sys.stderr.write(text)
+            sys.stderr.flush()
+
+    def ereignis(e):
+        sys.stdout.write(json.dumps(e, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+    if args.befehl == "compress":
+        namen = [p.name for p in dateien]
+        doppelt = sorted({n for n in namen if namen.count(n) > 1})
+        if doppelt:
+            parser.error(f"mehrere Eingaben mit gleichem Dateinamen: {', '.join(doppelt)}")
+        profil = {"dpi": args.downsample_dpi, "qualitaet": args.jpeg_quality} if args.downsample_dpi > 0 else None
+        ergebnisse = verarbeite_pdfs(dateien, ausgabe, args.exclude, log, args.workers,
+                                     durchreichen=args.copy_through, ereignis_callback=ereignis,
+                                     profil=profil, metriken=args.metrics)
+        sys.exit(1 if any(e["status"] == "error" for e in ergebnisse) else 0)
+    else:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        fuehre_zusammen(dateien, args.out.parent, args.out.name, log, args.batch_size,
+                        args.dedup, ereignis_callback=ereignis, metriken=args.metrics)
+        sys.exit(0 if args.out.exists() else 1)
+
+
+if __name__ == "__main__":
+    main()